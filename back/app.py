@@ -4,6 +4,8 @@ from config import Config
 from extensions import db
 from routes.neighborhoods_routes import neighborhood_bp
 from routes.complaints_routes import complaint_bp
+from routes.predictions_routes import prediction_bp
+from services import metrics, predictions
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -11,9 +13,13 @@ app.config.from_object(Config)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
 db.init_app(app)
+metrics.init_app(app)
 
 app.register_blueprint(complaint_bp, url_prefix='/api')
 app.register_blueprint(neighborhood_bp, url_prefix='/api')
+app.register_blueprint(prediction_bp, url_prefix='/api')
+
+predictions.init_app(app)
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,66 @@
+# back/bench_geo.py
+# Mesure le débit (points/s) de l'index spatial des quartiers sur des points
+# tirés dans l'emprise de la carte, comparé à un test exact via STRtree seul.
+# Usage : python bench_geo.py [--points N] [--grid N]
+
+import argparse
+import time
+import numpy as np
+import shapely
+from flask import Flask
+from config import Config
+from services import geo
+
+app = Flask(__name__)
+app.config.from_object(Config)
+
+
+def rate(n, seconds):
+    return f"{n / max(seconds, 1e-9):>12,.0f} points/s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'index spatial des quartiers")
+    parser.add_argument('--points', type=int, default=200_000)
+    parser.add_argument('--grid', type=int, default=geo.GRID_SIZE)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    index = geo.NeighborhoodIndex.from_file(app.config['NEIGHBORHOODS_GEOJSON'], args.grid)
+    build = time.perf_counter() - t0
+    cells = index.cells
+    print(f"⚙️  Index {args.grid}×{args.grid} construit en {build:.2f}s : "
+          f"{len(index.names)} quartiers, "
+          f"{(cells >= 0).mean():.0%} cellules intérieures, "
+          f"{(cells == geo.BOUNDARY).mean():.0%} frontière")
+
+    rng = np.random.default_rng(0)
+    (min_lon, min_lat), (max_lon, max_lat) = app.config['MAP_BOUNDS']
+    lons = rng.uniform(min_lon, max_lon, args.points)
+    lats = rng.uniform(min_lat, max_lat, args.points)
+
+    t0 = time.perf_counter()
+    names = index.lookup_many(lons, lats)
+    print(f"  grille, vectorisé   {rate(args.points, time.perf_counter() - t0)}")
+
+    sample = min(args.points, 20_000)
+    t0 = time.perf_counter()
+    for lon, lat in zip(lons[:sample], lats[:sample]):
+        index.lookup(lon, lat)
+    print(f"  grille, point à point {rate(sample, time.perf_counter() - t0)}")
+
+    # référence : STRtree + test exact pour chaque point
+    tree = shapely.STRtree(index.polygons)
+    t0 = time.perf_counter()
+    point_idx, poly_idx = tree.query(shapely.points(lons, lats), predicate='within')
+    print(f"  STRtree, exact      {rate(args.points, time.perf_counter() - t0)}")
+
+    expected = np.full(args.points, None, dtype=object)
+    expected[point_idx] = index.names[poly_idx]
+    mismatches = int((names != expected).sum())
+    print(f"✅ {np.count_nonzero(names.astype(bool))} points dans un quartier, "
+          f"{mismatches} écarts avec la référence")
+
+
+if __name__ == '__main__':
+    main()
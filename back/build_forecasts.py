@@ -0,0 +1,82 @@
+# back/build_forecasts.py
+# Calcule les prévisions de tous les quartiers (un lot par modèle, cf.
+# Predictor.predict_batch) et les enregistre dans la table forecasts, lue
+# en priorité par GET /api/predictions. À lancer chaque nuit.
+# Usage : python build_forecasts.py [--from AAAA-MM-JJ] [--to AAAA-MM-JJ] [--model lgbm lstm]
+
+import argparse
+import time
+import pandas as pd
+from flask import Flask
+from sqlalchemy import delete, insert
+from extensions import db
+from config import Config
+from models.neighborhoods import Neighborhood
+from models.forecasts import Forecast
+from services import predictions
+
+app = Flask(__name__)
+app.config.from_object(Config)
+db.init_app(app)
+
+
+def store(batch, model, mapping):
+    """Remplace les prévisions de `model` pour les jours du lot ; renvoie le nombre de lignes."""
+    codes = [c for c in batch.columns if c not in ('QUARTIER', 'DATE')]
+    counts = batch[codes].to_numpy()
+    rows, unknown = [], set()
+    for i, (quartier, day) in enumerate(zip(batch['QUARTIER'], batch['DATE'])):
+        nid = mapping.get(quartier)
+        if nid is None:
+            unknown.add(quartier)
+            continue
+        nonzero = counts[i].nonzero()[0]
+        rows.append({
+            'neighborhood_id': nid, 'day': day.date(), 'model': model,
+            'counts': {codes[j]: int(counts[i, j]) for j in nonzero},
+            'total': int(counts[i].sum()),
+        })
+    if unknown:
+        print(f"  ⚠️  {len(unknown)} quartiers absents de la base ignorés")
+
+    days = sorted({d.date() for d in batch['DATE']})
+    db.session.execute(delete(Forecast).where(Forecast.model == model, Forecast.day.in_(days)))
+    if rows:
+        db.session.execute(insert(Forecast), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prévisions de tous les quartiers → table forecasts")
+    parser.add_argument('--from', dest='start', help="premier jour (défaut : dernier jour du dataset)")
+    parser.add_argument('--to', dest='end', help="dernier jour (défaut : --from)")
+    parser.add_argument('--model', nargs='+', choices=predictions.BACKENDS, default=list(predictions.BACKENDS))
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        t0 = time.perf_counter()
+        predictor = predictions.get_predictor()
+        print(f"⚙️  Modèles chargés en {time.perf_counter() - t0:.1f}s : {', '.join(predictor.available())}")
+
+        last = predictor.store.last_date()
+        start = pd.Timestamp(args.start) if args.start else last
+        end = pd.Timestamp(args.end) if args.end else start
+        dates = pd.date_range(start, end)
+        mapping = {n.name: n.id for n in Neighborhood.query.all()}
+
+        for model in args.model:
+            if model not in predictor.available():
+                print(f"  ⚠️  modèle {model} indisponible, ignoré")
+                continue
+            t0 = time.perf_counter()
+            batch = predictor.predict_batch(dates, model)
+            n = store(batch, model, mapping)
+            print(f"  → {model} : {n} prévisions du {start.date()} au {end.date()} "
+                  f"en {time.perf_counter() - t0:.1f}s")
+    print("✅ Prévisions enregistrées.")
+
+
+if __name__ == '__main__':
+    main()
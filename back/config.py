@@ -3,9 +3,53 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def engine_options(url):
+    """Réglages du moteur SQLAlchemy selon le backend de `url`."""
+    backend = url.split(':', 1)[0].split('+', 1)[0]
+    if backend in ('mysql', 'mariadb', 'postgresql'):
+        # serveur : pool borné, connexions vérifiées avant usage et renouvelées
+        # avant que le serveur ne coupe les connexions inactives (wait_timeout)
+        return {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+            'pool_pre_ping': True,
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        }
+    if backend == 'sqlite':
+        # fichier local : un seul écrivain à la fois, on attend le verrou
+        # plutôt que d'échouer aussitôt (database is locked)
+        return {'connect_args': {'timeout': 30}}
+    return {}   # DuckDB… : base embarquée, réglages par défaut
+
+
 class Config:
-    SQLALCHEMY_DATABASE_URI = (
+    # DATABASE_URL (ex. sqlite:////tmp/nyc.db, duckdb:////tmp/nyc.duckdb) remplace
+    # la base MySQL décrite par les variables DB_*
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL') or (
         f"mysql+mysqlconnector://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
         f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
     )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Emprise de la carte (cf. MAP_BOUNDS dans webapp/citysafe/src/config/mapConfig.js)
+    MAP_BOUNDS = ((-74.25909, 40.477399), (-73.700272, 40.917577))
+
+    # Cache des réponses GET (services/cache.py)
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 512))
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 300))
+
+    # Polygones des quartiers, pour retrouver le quartier d'un point (services/geo.py)
+    NEIGHBORHOODS_GEOJSON = os.getenv('NEIGHBORHOODS_GEOJSON', os.path.abspath(os.path.join(
+        os.path.dirname(__file__), '..', 'webapp', 'citysafe', 'public', 'neighborhoods.geojson'
+    )))
+
+    # Chargement des modèles de prédiction au démarrage (services/predictions.py)
+    PREDICTIONS_PRELOAD = os.getenv('PREDICTIONS_PRELOAD', '1') == '1'
+
+    # Instrumentation exposée sur /metrics (services/metrics.py) ; seuils de
+    # journalisation des requêtes lentes, 0 = désactivé
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+    METRICS_SLOW_REQUEST_MS = float(os.getenv('METRICS_SLOW_REQUEST_MS', 0))
+    METRICS_SLOW_REQUEST_QUERIES = int(os.getenv('METRICS_SLOW_REQUEST_QUERIES', 0))
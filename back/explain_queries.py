@@ -0,0 +1,118 @@
+# back/explain_queries.py
+# Rejoue chaque route GET de l'API, capture les SELECT émis et affiche leur
+# plan EXPLAIN en signalant les scans complets de table.
+# Usage : python explain_queries.py [--strict]  (code retour 1 si scan complet)
+
+import argparse
+import sys
+from urllib.parse import urlencode
+from sqlalchemy import event, func
+from extensions import db
+from models.neighborhoods import Neighborhood
+from models.complaints import Complaint
+from models.complaint_counts import ComplaintCount
+from services import cache, lookups, rollup, tiles
+
+
+def sample_urls():
+    """URLs d'exemple par endpoint GET, paramétrées avec des valeurs de la base."""
+    nid = db.session.query(func.min(Neighborhood.id)).scalar() or 1
+    crime = lookups.decode(
+        db.session.query(ComplaintCount.ofns_desc_id)
+        .filter(ComplaintCount.ofns_desc_id != rollup.UNKNOWN_TYPE).limit(1).scalar()
+    ) or ''
+    max_id = db.session.query(func.max(Complaint.id)).scalar() or 0
+    x, y = tiles.lonlat_to_tile(-73.98, 40.75, 12)
+    raw_z = tiles.RAW_MIN_ZOOM
+    raw_x, raw_y = tiles.lonlat_to_tile(-73.98, 40.75, raw_z)
+    return {
+        'complaint_bp.get_all_complaints': [f'/api/complaints?after_id={max(max_id - 100, 0)}'],
+        'complaint_bp.get_complaint_tile': [f'/api/complaints/tiles/12/{x}/{y}',
+                                            f'/api/complaints/tiles/{raw_z}/{raw_x}/{raw_y}'],
+        'complaint_bp.get_crime_type_counts': [f'/api/complaints/type_counts?neighborhood_id={nid}'],
+        'complaint_bp.get_top_neighborhoods': ['/api/complaints/top_neighborhoods?' + urlencode({'crime_type': crime, 'limit': 5})],
+        'complaint_bp.get_crime_types': ['/api/complaints/types'],
+        'neighborhood_bp.get_neighborhoods': ['/api/neighborhoods'],
+        'neighborhood_bp.get_neighborhood': [f'/api/neighborhoods/{nid}'],
+        'neighborhood_bp.get_crime_count': [f'/api/neighborhoods/{nid}/crime_count'],
+        'prediction_bp.get_predictions': [f'/api/predictions?neighborhood={nid}&date=2025-03-05'],
+        'metrics': ['/metrics'],
+    }
+
+
+def explain(statement, parameters):
+    with db.engine.connect() as conn:
+        prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+        return [dict(r) for r in conn.exec_driver_sql(prefix + statement, parameters).mappings()]
+
+
+# tables qui grossissent avec les données (les petites tables peuvent être scannées)
+LARGE_TABLES = {Complaint.__tablename__, ComplaintCount.__tablename__}
+
+
+def full_scans(plan):
+    if db.engine.dialect.name == 'sqlite':
+        return [r for r in plan
+                if r['detail'].split()[:2] in (['SCAN', t] for t in LARGE_TABLES)
+                and ' USING ' not in r['detail']]
+    if db.engine.dialect.name in ('mysql', 'mariadb'):
+        return [r for r in plan if r.get('type') == 'ALL' and r.get('table') in LARGE_TABLES]
+    return []   # autres bases (DuckDB…) : plan affiché, non analysé
+
+
+def check(app):
+    """Affiche les plans de toutes les routes GET ; renvoie le nombre de scans complets."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            captured.append((statement, parameters))
+
+    issues = 0
+    with app.app_context():
+        urls = sample_urls()
+        endpoints = sorted(
+            rule.endpoint for rule in app.url_map.iter_rules()
+            if 'GET' in rule.methods and rule.endpoint != 'static'
+        )
+        client = app.test_client()
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            for endpoint in endpoints:
+                if endpoint not in urls:
+                    print(f"⚠️  {endpoint} : pas d'URL d'exemple, requêtes non vérifiées")
+                    continue
+                for url in urls[endpoint]:
+                    # on vide le cache pour que la route interroge réellement la base
+                    cache.bump('complaints', 'neighborhoods')
+                    tiles.invalidate()
+                    captured.clear()
+                    response = client.get(url)
+                    response.get_data()
+                    print(f"\n=== {endpoint}  GET {url}  → {response.status_code}")
+                    for statement, parameters in list(captured):
+                        plan = explain(statement, parameters)
+                        print("  " + " ".join(statement.split())[:160])
+                        for row in plan:
+                            print("    ", row)
+                        for row in full_scans(plan):
+                            issues += 1
+                            print("    ❌ scan complet :", row)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+    print(f"\n{'✅ Aucun' if not issues else f'❌ {issues}'} scan complet détecté.")
+    return issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plans EXPLAIN des requêtes de chaque route")
+    parser.add_argument('--strict', action='store_true', help="code retour 1 si un scan complet est détecté")
+    args = parser.parse_args()
+
+    from app import app
+    issues = check(app)
+    if args.strict and issues:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# back/migrate.py
+# Met à niveau le schéma d'une base existante vers celui des modèles :
+# colonnes catégorielles TEXT → VARCHAR bornés, encodage de ces colonnes
+# en ids de la table lookups, puis index composites.
+# Chaque étape vérifie l'état courant et peut être relancée sans risque.
+
+import sys
+from flask import Flask
+from sqlalchemy import func, inspect, text
+from extensions import db
+from config import Config
+from models.neighborhoods import Neighborhood
+from models.complaints import Complaint, ENCODED_COLUMNS
+from models.lookups import Lookup
+from models.complaint_counts import ComplaintCount
+from models.import_checkpoints import ImportCheckpoint
+from models.forecasts import Forecast
+from services import rollup
+
+app = Flask(__name__)
+app.config.from_object(Config)
+db.init_app(app)
+
+
+def bounded_varchars():
+    """TEXT → VARCHAR(n) pour les colonnes déclarées VARCHAR dans le modèle (MySQL)."""
+    engine = db.engine
+    if engine.dialect.name not in ('mysql', 'mariadb'):
+        print("  · conversion VARCHAR ignorée (dialecte", engine.dialect.name + ")")
+        return
+    current = {c['name']: c['type'] for c in inspect(engine).get_columns('complaints')}
+    for column in Complaint.__table__.columns:
+        length = getattr(column.type, 'length', None)
+        if length is None or column.name not in current:
+            continue
+        if getattr(current[column.name], 'length', None) == length:
+            continue
+        longest = db.session.query(func.max(func.char_length(column))).scalar() or 0
+        if longest > length:
+            sys.exit(f"❌ {column.name} : valeur de {longest} caractères > VARCHAR({length})")
+        ddl = column.type.compile(dialect=engine.dialect)
+        db.session.execute(text(f"ALTER TABLE complaints MODIFY {column.name} {ddl}"))
+        print(f"  → {column.name} : {current[column.name]} → {ddl}")
+
+
+def dictionary_encoding():
+    """
+    Colonnes catégorielles texte → `<col>_id` vers lookups : ajout de la
+    colonne, remplissage du dictionnaire et des ids, puis suppression de
+    l'ancienne colonne (et des index qui la contenaient).
+    """
+    engine = db.engine
+    columns = {c['name'] for c in inspect(engine).get_columns('complaints')}
+    for kind in ENCODED_COLUMNS:
+        id_column = f"{kind}_id"
+        if id_column not in columns:
+            ddl = Complaint.__table__.c[id_column].type.compile(dialect=engine.dialect)
+            db.session.execute(text(f"ALTER TABLE complaints ADD COLUMN {id_column} {ddl}"))
+            if engine.dialect.name in ('mysql', 'mariadb'):
+                db.session.execute(text(
+                    f"ALTER TABLE complaints ADD CONSTRAINT fk_complaints_{id_column} "
+                    f"FOREIGN KEY ({id_column}) REFERENCES lookups (id)"
+                ))
+        if kind not in columns:
+            continue
+
+        db.session.execute(text(
+            f"INSERT INTO lookups (kind, value) "
+            f"SELECT DISTINCT :kind, TRIM({kind}) FROM complaints "
+            f"WHERE {kind} IS NOT NULL AND TRIM({kind}) <> '' "
+            f"AND TRIM({kind}) NOT IN (SELECT value FROM lookups WHERE kind = :kind)"
+        ), {"kind": kind})
+        db.session.execute(text(
+            f"UPDATE complaints SET {id_column} = "
+            f"(SELECT id FROM lookups WHERE kind = :kind AND value = TRIM(complaints.{kind}))"
+        ), {"kind": kind})
+
+        for index in inspect(engine).get_indexes('complaints'):
+            if kind in index['column_names']:
+                db.session.execute(text(f"DROP INDEX {index['name']} ON complaints")
+                                   if engine.dialect.name in ('mysql', 'mariadb')
+                                   else text(f"DROP INDEX {index['name']}"))
+        db.session.execute(text(f"ALTER TABLE complaints DROP COLUMN {kind}"))
+        db.session.commit()
+        print(f"  → {kind} encodé dans {id_column}")
+
+    # ancien rollup indexé par le texte du type : recréé puis recalculé
+    db.session.commit()
+    if 'ofns_desc' in {c['name'] for c in inspect(engine).get_columns('complaint_counts')}:
+        ComplaintCount.__table__.drop(engine)
+        ComplaintCount.__table__.create(engine)
+        print(f"  → rollup complaint_counts recalculé ({rollup.rebuild()} lignes)")
+
+
+def indexes():
+    """Crée les index déclarés dans les modèles, et recrée ceux dont les colonnes ont changé."""
+    inspector = inspect(db.engine)
+    for model in (Complaint, ComplaintCount):
+        existing = {ix['name']: ix['column_names'] for ix in inspector.get_indexes(model.__tablename__)}
+        for index in model.__table__.indexes:
+            wanted = [c.name for c in index.columns]
+            if existing.get(index.name) == wanted:
+                continue
+            if index.name in existing:
+                index.drop(db.engine)
+            index.create(db.engine)
+            print(f"  → index {index.name} ({', '.join(wanted)}) créé")
+
+
+MIGRATIONS = [
+    ("colonnes catégorielles en VARCHAR", bounded_varchars),
+    ("encodage des colonnes catégorielles (lookups)", dictionary_encoding),
+    ("index composites", indexes),
+]
+
+
+def run():
+    """Applique les étapes dans l'ordre (à appeler dans un app context)."""
+    db.create_all()
+    for label, step in MIGRATIONS:
+        print(f"⚙️  {label}…")
+        step()
+        db.session.commit()
+    print("✅ Schéma à jour.")
+
+
+def main():
+    with app.app_context():
+        run()
+
+if __name__ == '__main__':
+    main()
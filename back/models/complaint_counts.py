@@ -0,0 +1,15 @@
+from extensions import db
+from models.types import UNSIGNED_INT, UNSIGNED_SMALLINT
+
+class ComplaintCount(db.Model):
+    """Rollup (quartier, type d'infraction, jour) → nombre de plaintes."""
+    __tablename__ = 'complaint_counts'
+    __table_args__ = (
+        # top_neighborhoods : filtre par type puis regroupement par quartier
+        db.Index('ix_complaint_counts_ofns_nbh', 'ofns_desc_id', 'neighborhood_id'),
+    )
+
+    neighborhood_id = db.Column(UNSIGNED_INT, db.ForeignKey('neighborhoods.id'), primary_key=True)
+    ofns_desc_id = db.Column(UNSIGNED_SMALLINT, primary_key=True)  # id lookups, 0 = inconnu
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(UNSIGNED_INT, nullable=False, default=0)
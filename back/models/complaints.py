@@ -1,47 +1,65 @@
 from extensions import db
-from sqlalchemy.dialects.mysql import DATE, INTEGER, DOUBLE, TEXT, TIMESTAMP, VARCHAR
+from models.types import COORDINATE, TIMESTAMP_US, UNSIGNED_INT, UNSIGNED_SMALLINT
+
+# Colonnes catégorielles stockées en entiers vers la table lookups
+# (colonne `<nom>_id`), l'API continue d'exposer `<nom>` en texte.
+ENCODED_COLUMNS = (
+    'boro_nm', 'crm_atpt_cptd_cd', 'juris_desc', 'law_cat_cd', 'loc_of_occur_desc',
+    'ofns_desc', 'patrol_boro', 'pd_desc', 'prem_typ_desc',
+    'susp_age_group', 'susp_race', 'susp_sex', 'vic_age_group', 'vic_race', 'vic_sex',
+)
 
 class Complaint(db.Model):
     __tablename__ = 'complaints'
-    
-    id = db.Column(INTEGER(unsigned=True), primary_key=True, autoincrement=True)
-    cmplnt_num = db.Column(TEXT)
-    addr_pct_cd = db.Column(INTEGER)
-    boro_nm = db.Column(TEXT)
-    cmplnt_fr_dt = db.Column(DATE, nullable=True)
-    cmplnt_fr_tm = db.Column(TEXT)
-    cmplnt_to_dt = db.Column(DATE, nullable=True)
-    cmplnt_to_tm = db.Column(TEXT)
-    crm_atpt_cptd_cd = db.Column(TEXT)
-    hadevelopt = db.Column(TEXT)
-    housing_psa = db.Column(INTEGER)
-    jurisdiction_code = db.Column(INTEGER)
-    juris_desc = db.Column(TEXT)
-    ky_cd = db.Column(INTEGER)
-    law_cat_cd = db.Column(TEXT)
-    loc_of_occur_desc = db.Column(TEXT)
-    ofns_desc = db.Column(TEXT)
-    parks_nm = db.Column(TEXT)
-    patrol_boro = db.Column(TEXT)
-    pd_cd = db.Column(INTEGER)
-    pd_desc = db.Column(TEXT)
-    prem_typ_desc = db.Column(TEXT)
-    rpt_dt = db.Column(TIMESTAMP(fsp=6))
-    station_name = db.Column(TEXT)
-    susp_age_group = db.Column(TEXT)
-    susp_race = db.Column(TEXT)
-    susp_sex = db.Column(TEXT)
-    transit_district = db.Column(INTEGER)
-    vic_age_group = db.Column(TEXT)
-    vic_race = db.Column(TEXT)
-    vic_sex = db.Column(TEXT)
-    x_coord_cd = db.Column(INTEGER)
-    y_coord_cd = db.Column(INTEGER)
-    latitude = db.Column(DOUBLE(10, 6))
-    longitude = db.Column(DOUBLE(10, 6))
-    lat_lon = db.Column(VARCHAR(100))
-    geocoded_column = db.Column(TEXT)
+    __table_args__ = (
+        # type_counts / crime_count / rebuild du rollup (couvrant)
+        db.Index('ix_complaints_nbh_ofns_dt', 'neighborhood_id', 'ofns_desc_id', 'cmplnt_fr_dt'),
+        # top_neighborhoods par type
+        db.Index('ix_complaints_ofns_nbh', 'ofns_desc_id', 'neighborhood_id'),
+        # filtres par période
+        db.Index('ix_complaints_dt_nbh', 'cmplnt_fr_dt', 'neighborhood_id'),
+        # agrégation des tuiles sur l'emprise de la carte (couvrant)
+        db.Index('ix_complaints_lon_lat', 'longitude', 'latitude'),
+    )
+
+    id = db.Column(UNSIGNED_INT, db.Sequence('complaints_id_seq'), primary_key=True, autoincrement=True)
+    cmplnt_num = db.Column(db.Text)
+    addr_pct_cd = db.Column(db.Integer)
+    boro_nm_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    cmplnt_fr_dt = db.Column(db.Date, nullable=True)
+    cmplnt_fr_tm = db.Column(db.Text)
+    cmplnt_to_dt = db.Column(db.Date, nullable=True)
+    cmplnt_to_tm = db.Column(db.Text)
+    crm_atpt_cptd_cd_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    hadevelopt = db.Column(db.Text)
+    housing_psa = db.Column(db.Integer)
+    jurisdiction_code = db.Column(db.Integer)
+    juris_desc_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    ky_cd = db.Column(db.Integer)
+    law_cat_cd_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    loc_of_occur_desc_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    ofns_desc_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    parks_nm = db.Column(db.Text)
+    patrol_boro_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    pd_cd = db.Column(db.Integer)
+    pd_desc_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    prem_typ_desc_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    rpt_dt = db.Column(TIMESTAMP_US)
+    station_name = db.Column(db.Text)
+    susp_age_group_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    susp_race_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    susp_sex_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    transit_district = db.Column(db.Integer)
+    vic_age_group_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    vic_race_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    vic_sex_id = db.Column(UNSIGNED_SMALLINT, db.ForeignKey('lookups.id'))
+    x_coord_cd = db.Column(db.Integer)
+    y_coord_cd = db.Column(db.Integer)
+    latitude = db.Column(COORDINATE)
+    longitude = db.Column(COORDINATE)
+    lat_lon = db.Column(db.String(100))
+    geocoded_column = db.Column(db.Text)
 
     # Relation avec Neighborhood
-    neighborhood_id = db.Column(INTEGER(unsigned=True), db.ForeignKey('neighborhoods.id'))
+    neighborhood_id = db.Column(UNSIGNED_INT, db.ForeignKey('neighborhoods.id'))
     neighborhood = db.relationship('Neighborhood', backref=db.backref('complaints', lazy=True))
@@ -0,0 +1,13 @@
+from extensions import db
+from models.types import UNSIGNED_INT
+
+class Forecast(db.Model):
+    """Prévision précalculée (quartier, jour, modèle) → compteurs par code d'infraction."""
+    __tablename__ = 'forecasts'
+
+    neighborhood_id = db.Column(UNSIGNED_INT, db.ForeignKey('neighborhoods.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    model = db.Column(db.String(8), primary_key=True)      # 'lgbm', 'lstm' ou 'tflite'
+    counts = db.Column(db.JSON, nullable=False)            # {code KY_CD: nombre prévu > 0}
+    total = db.Column(UNSIGNED_INT, nullable=False, default=0)
+    created_at = db.Column(db.TIMESTAMP, server_default=db.func.now())
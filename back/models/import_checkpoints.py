@@ -0,0 +1,11 @@
+from extensions import db
+from models.types import UNSIGNED_BIGINT
+
+class ImportCheckpoint(db.Model):
+    """Nombre de lignes d'un fichier source déjà importées (reprise de seed_db)."""
+    __tablename__ = 'import_checkpoints'
+
+    source = db.Column(db.String(255), primary_key=True)
+    rows = db.Column(UNSIGNED_BIGINT, nullable=False, default=0)
+    offset = db.Column(UNSIGNED_BIGINT, nullable=False, default=0)  # octets déjà lus (mode --workers)
+    updated_at = db.Column(db.TIMESTAMP, server_default=db.func.now(), onupdate=db.func.now())
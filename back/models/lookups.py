@@ -0,0 +1,13 @@
+from extensions import db
+from models.types import UNSIGNED_SMALLINT
+
+class Lookup(db.Model):
+    """Dictionnaire des valeurs catégorielles des plaintes (type d'infraction, lieu, démographie…)."""
+    __tablename__ = 'lookups'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'value', name='uq_lookups_kind_value'),
+    )
+
+    id = db.Column(UNSIGNED_SMALLINT, db.Sequence('lookups_id_seq'), primary_key=True, autoincrement=True)
+    kind = db.Column(db.String(30), nullable=False)    # nom de la colonne encodée, ex. 'ofns_desc'
+    value = db.Column(db.String(255), nullable=False)
@@ -1,9 +1,9 @@
 from extensions import db
-from sqlalchemy.dialects.mysql import INTEGER, VARCHAR
+from models.types import UNSIGNED_INT
 
 class Neighborhood(db.Model):
     __tablename__ = 'neighborhoods'
 
-    id = db.Column(INTEGER(unsigned=True), primary_key=True, autoincrement=True)
-    name = db.Column(VARCHAR(100), nullable=False)
-    boro = db.Column(VARCHAR(100), nullable=False)
+    id = db.Column(UNSIGNED_INT, db.Sequence('neighborhoods_id_seq'), primary_key=True, autoincrement=True)
+    name = db.Column(db.String(100), nullable=False)
+    boro = db.Column(db.String(100), nullable=False)
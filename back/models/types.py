@@ -0,0 +1,23 @@
+"""
+Types de colonnes indépendants du dialecte : type générique SQLAlchemy, avec
+le type MySQL d'origine en variante (schéma MySQL inchangé). SQLite, DuckDB…
+reçoivent le type générique.
+
+Les clés auto-incrémentées déclarent aussi une Sequence (<table>_id_seq) :
+DuckDB n'a pas d'AUTOINCREMENT, MySQL et SQLite l'ignorent.
+"""
+from sqlalchemy import BigInteger, DateTime, Double, Integer, SmallInteger
+from sqlalchemy.dialects import mysql
+
+MYSQL = ('mysql', 'mariadb')
+
+UNSIGNED_INT = Integer().with_variant(mysql.INTEGER(unsigned=True), *MYSQL)
+UNSIGNED_BIGINT = BigInteger().with_variant(mysql.BIGINT(unsigned=True), *MYSQL)
+# SQLite n'auto-incrémente qu'une clé INTEGER PRIMARY KEY (lookups.id)
+UNSIGNED_SMALLINT = (
+    SmallInteger()
+    .with_variant(mysql.SMALLINT(unsigned=True), *MYSQL)
+    .with_variant(Integer(), 'sqlite')
+)
+COORDINATE = Double().with_variant(mysql.DOUBLE(10, 6), *MYSQL)
+TIMESTAMP_US = DateTime().with_variant(mysql.TIMESTAMP(fsp=6), *MYSQL)
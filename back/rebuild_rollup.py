@@ -0,0 +1,20 @@
+# back/rebuild_rollup.py
+# Reconstruit la table complaint_counts à partir de la table complaints.
+
+from flask import Flask
+from extensions import db
+from config import Config
+from services import rollup
+
+app = Flask(__name__)
+app.config.from_object(Config)
+db.init_app(app)
+
+def main():
+    with app.app_context():
+        print("⚙️  Reconstruction du rollup complaint_counts…")
+        n = rollup.rebuild()
+        print(f"✅ Rollup reconstruit : {n} lignes.")
+
+if __name__ == '__main__':
+    main()
@@ -1,79 +1,208 @@
-from flask import Blueprint, request, jsonify
-from models.complaints import db, Complaint
+import json
+from flask import Blueprint, Response, abort, current_app, request, jsonify, stream_with_context
+from models.complaints import db, Complaint, ENCODED_COLUMNS
 from models.neighborhoods import Neighborhood
+from models.complaint_counts import ComplaintCount
 from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from services import cache, ingest, live_window, lookups, rollup, tiles
 
 complaint_bp = Blueprint('complaint_bp', __name__)
 
+# Taille d'une page keyset pour le streaming de /complaints
+STREAM_PAGE_SIZE = 5000
+# Nombre de lignes NDJSON par INSERT multi-lignes pour /complaints/bulk
+BULK_BATCH_SIZE = 1000
+# Lignes en erreur détaillées dans la réponse de /complaints/bulk (toutes sont comptées)
+MAX_BULK_ERRORS = 1000
+DEFAULT_FIELDS = ["id", "cmplnt_num", "boro_nm", "latitude", "longitude", "neighborhood"]
+ENCODED_IDS = {f"{kind}_id" for kind in ENCODED_COLUMNS}
+COMPLAINT_FIELDS = (
+    {c.name for c in Complaint.__table__.columns} - ENCODED_IDS
+) | set(ENCODED_COLUMNS) | {"neighborhood"}
+
+
+class _BulkErrors(list):
+    """Liste d'erreurs bornée à `limit` entrées ; `count` les compte toutes."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.count = 0
+
+    def append(self, error):
+        self.count += 1
+        if len(self) < self.limit:
+            super().append(error)
+
+
+def _parse_fields(raw):
+    if not raw:
+        return DEFAULT_FIELDS
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in COMPLAINT_FIELDS]
+    if unknown:
+        abort(400, f"unknown fields: {', '.join(unknown)}")
+    return fields
+
+
 @complaint_bp.route('/complaints', methods=['GET'])
 def get_all_complaints():
-    complaints = Complaint.query.all()
-    result = []
-    for c in complaints:
-        result.append({
-            "id": c.id,
-            "cmplnt_num": c.cmplnt_num,
-            "boro_nm": c.boro_nm,
-            "latitude": c.latitude,
-            "longitude": c.longitude,
-            "neighborhood": {
-                "id": c.neighborhood.id,
-                "name": c.neighborhood.name
-            } if c.neighborhood else None
-        })
-    return jsonify(result), 200
+    """
+    Stream des plaintes page par page (curseur keyset sur id), sans jamais
+    charger toute la table : seules les colonnes de `fields` sont lues et les
+    quartiers viennent d'un dict préchargé.
+    Paramètres : fields, after_id, page_size, format=json|ndjson.
+    """
+    fields = _parse_fields(request.args.get('fields'))
+    after_id = request.args.get('after_id', 0, type=int)
+    page_size = min(max(request.args.get('page_size', STREAM_PAGE_SIZE, type=int), 1), STREAM_PAGE_SIZE)
+    ndjson = request.args.get('format') == 'ndjson'
+
+    columns = [Complaint.id] + [
+        getattr(Complaint, f"{f}_id" if f in ENCODED_COLUMNS else f)
+        for f in fields if f not in ("id", "neighborhood")
+    ]
+    with_neighborhood = "neighborhood" in fields
+    if with_neighborhood:
+        columns.append(Complaint.neighborhood_id)
+        names = dict(db.session.query(Neighborhood.id, Neighborhood.name).all())
+
+    def serialize(row):
+        item = {}
+        for f in fields:
+            if f == "neighborhood":
+                nid = row.neighborhood_id
+                item[f] = {"id": nid, "name": names[nid]} if nid in names else None
+            elif f in ENCODED_COLUMNS:
+                item[f] = lookups.decode(getattr(row, f"{f}_id"))
+            else:
+                item[f] = getattr(row, f)
+        return current_app.json.dumps(item)
+
+    def generate():
+        last_id = after_id
+        first = True
+        if not ndjson:
+            yield "["
+        while True:
+            rows = (
+                db.session.query(*columns)
+                .filter(Complaint.id > last_id)
+                .order_by(Complaint.id)
+                .limit(page_size)
+                .all()
+            )
+            if not rows:
+                break
+            if ndjson:
+                yield "".join(serialize(r) + "\n" for r in rows)
+            else:
+                chunk = ",".join(serialize(r) for r in rows)
+                yield chunk if first else "," + chunk
+            first = False
+            last_id = rows[-1].id
+        if not ndjson:
+            yield "]"
+
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+    return Response(stream_with_context(generate()), status=200, mimetype=mimetype)
+
+@complaint_bp.route('/complaints/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+@cache.cached("complaints")
+def get_complaint_tile(z, x, y):
+    if not (0 <= z <= 22 and 0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        abort(404, "Tile out of range")
+    return jsonify(tiles.tile_geojson(z, x, y)), 200
 
 @complaint_bp.route('/complaints/type_counts', methods=['GET'])
+@cache.cached("complaints")
 def get_crime_type_counts():
     neighborhood_id = request.args.get('neighborhood_id', type=int)
     if neighborhood_id is None:
         abort(400, "neighborhood_id required")
+    total = func.sum(ComplaintCount.count)
     rows = (
         db.session.query(
-            Complaint.ofns_desc.label('type'),
-            func.count(Complaint.id).label('count')
+            ComplaintCount.ofns_desc_id.label('type'),
+            total.label('count')
         )
-        .filter(Complaint.neighborhood_id == neighborhood_id)
-        .group_by(Complaint.ofns_desc)
-        .order_by(func.count(Complaint.id).desc())
+        .filter(ComplaintCount.neighborhood_id == neighborhood_id)
+        .group_by(ComplaintCount.ofns_desc_id)
+        .order_by(total.desc())
         .all()
     )
-    return jsonify([{"type": r.type, "count": r.count} for r in rows]), 200
+    return jsonify([
+        {"type": lookups.decode(r.type or None), "count": int(r.count)}
+        for r in rows
+    ]), 200
 
 @complaint_bp.route('/complaints/top_neighborhoods', methods=['GET'])
+@cache.cached("complaints", "neighborhoods")
 def get_top_neighborhoods():
-    crime_type = request.args.get('crime_type')
-    if not crime_type:
-        return jsonify({"error": "crime_type required"}), 400
+    """
+    Top `limit` quartiers par type d'infraction, en une seule requête :
+    ROW_NUMBER() par type + jointure des quartiers.
+    Appel historique : un seul `crime_type` → liste.
+    Forme batch : `crime_types` (paramètre répété) → {type: liste}, même
+    pour un seul type.
+    """
+    batch = 'crime_types' in request.args
+    crime_types = [t for t in request.args.getlist('crime_types' if batch else 'crime_type') if t]
+    if not crime_types:
+        return jsonify({"error": "crime_type or crime_types required"}), 400
+    if not batch and len(crime_types) > 1:
+        return jsonify({"error": "use crime_types for several types"}), 400
+    limit = min(max(request.args.get('limit', 5, type=int), 1), 50)
+    # plusieurs libellés demandés peuvent désigner le même id (espaces…)
+    type_ids = {}
+    for t in crime_types:
+        type_id = lookups.encode('ofns_desc', t, create=False)
+        if type_id is not None:
+            type_ids.setdefault(type_id, []).append(t)
 
-    rows = (
+    total = func.sum(ComplaintCount.count)
+    ranked = (
         db.session.query(
-            Complaint.neighborhood_id,
-            func.count(Complaint.id).label('cnt')
+            ComplaintCount.ofns_desc_id.label('type'),
+            ComplaintCount.neighborhood_id.label('neighborhood_id'),
+            total.label('cnt'),
+            func.row_number().over(
+                partition_by=ComplaintCount.ofns_desc_id,
+                order_by=(total.desc(), ComplaintCount.neighborhood_id)
+            ).label('rank')
         )
-        .filter(Complaint.ofns_desc == crime_type)
-        .group_by(Complaint.neighborhood_id)
-        .order_by(func.count(Complaint.id).desc())
-        .limit(5)
+        .filter(ComplaintCount.ofns_desc_id.in_(type_ids))
+        .group_by(ComplaintCount.ofns_desc_id, ComplaintCount.neighborhood_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(ranked.c.type, ranked.c.neighborhood_id, ranked.c.cnt,
+                         Neighborhood.name, Neighborhood.boro)
+        .join(Neighborhood, Neighborhood.id == ranked.c.neighborhood_id)
+        .filter(ranked.c.rank <= limit)
+        .order_by(ranked.c.type, ranked.c.rank)
         .all()
     )
 
-    result = []
-    for nid, cnt in rows:
-        q = Neighborhood.query.get(nid)
-        if q:
-            result.append({
-                "neighborhood_id": nid,
-                "name": q.name,
-                "boro": q.boro,
-                "count": cnt
-            })
+    result = {t: [] for t in crime_types}
+    for r in rows:
+        item = {
+            "neighborhood_id": r.neighborhood_id,
+            "name": r.name,
+            "boro": r.boro,
+            "count": int(r.cnt)
+        }
+        for t in type_ids[r.type]:
+            result[t].append(item)
+    if not batch:
+        return jsonify(result[crime_types[0]]), 200
     return jsonify(result), 200
 
 @complaint_bp.route('/complaints/types', methods=['GET'])
+@cache.cached("complaints")
 def get_crime_types():
-    types = db.session.query(Complaint.ofns_desc).distinct().all()
-    return jsonify([t[0] for t in types]), 200
+    return jsonify(lookups.values('ofns_desc')), 200
 
 
 @complaint_bp.route('/complaints', methods=['POST'])
@@ -81,51 +210,58 @@ def create_complaint():
     data = request.get_json()
 
     try:
-        new_complaint = Complaint(
-            cmplnt_num=data.get("cmplnt_num"),
-            addr_pct_cd=data.get("addr_pct_cd"),
-            boro_nm=data.get("boro_nm"),
-            cmplnt_fr_dt=data.get("cmplnt_fr_dt"),
-            cmplnt_fr_tm=data.get("cmplnt_fr_tm"),
-            cmplnt_to_dt=data.get("cmplnt_to_dt"),
-            cmplnt_to_tm=data.get("cmplnt_to_tm"),
-            crm_atpt_cptd_cd=data.get("crm_atpt_cptd_cd"),
-            hadevelopt=data.get("hadevelopt"),
-            housing_psa=data.get("housing_psa"),
-            jurisdiction_code=data.get("jurisdiction_code"),
-            juris_desc=data.get("juris_desc"),
-            ky_cd=data.get("ky_cd"),
-            law_cat_cd=data.get("law_cat_cd"),
-            loc_of_occur_desc=data.get("loc_of_occur_desc"),
-            ofns_desc=data.get("ofns_desc"),
-            parks_nm=data.get("parks_nm"),
-            patrol_boro=data.get("patrol_boro"),
-            pd_cd=data.get("pd_cd"),
-            pd_desc=data.get("pd_desc"),
-            prem_typ_desc=data.get("prem_typ_desc"),
-            rpt_dt=data.get("rpt_dt"),
-            station_name=data.get("station_name"),
-            susp_age_group=data.get("susp_age_group"),
-            susp_race=data.get("susp_race"),
-            susp_sex=data.get("susp_sex"),
-            transit_district=data.get("transit_district"),
-            vic_age_group=data.get("vic_age_group"),
-            vic_race=data.get("vic_race"),
-            vic_sex=data.get("vic_sex"),
-            x_coord_cd=data.get("x_coord_cd"),
-            y_coord_cd=data.get("y_coord_cd"),
-            latitude=data.get("latitude"),
-            longitude=data.get("longitude"),
-            lat_lon=data.get("lat_lon"),
-            geocoded_column=data.get("geocoded_column"),
-            neighborhood_id=data.get("neighborhood_id")
-        )
+        values = ingest.complaint_values(data)
+        new_complaint = Complaint(**values)
 
         db.session.add(new_complaint)
+        db.session.flush()
+        rollup.record([new_complaint])
         db.session.commit()
+        live_window.record([values])
+        tiles.record([values])
+        cache.bump("complaints")
 
         return jsonify({"message": "Complaint created", "id": new_complaint.id}), 201
 
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
+
+
+@complaint_bp.route('/complaints/bulk', methods=['POST'])
+def create_complaints_bulk():
+    """
+    Import NDJSON (une plainte JSON par ligne) lu en flux : les lignes sont
+    validées puis insérées par paquets de BULK_BATCH_SIZE, chaque paquet étant
+    commité avec le rollup. Les lignes en erreur sont renvoyées avec leur
+    numéro (les MAX_BULK_ERRORS premières, plus error_count) sans interrompre
+    le reste de l'import.
+    """
+    inserted = 0
+    errors = _BulkErrors(MAX_BULK_ERRORS)
+    batch = []
+    try:
+        for line_no, line in enumerate(request.stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+                batch.append((line_no, ingest.complaint_values(data)))
+            except (ValueError, OverflowError) as e:
+                errors.append({"line": line_no, "error": str(e)})
+            except SQLAlchemyError as e:
+                # lookups.encode (valeur trop longue…) : seule la ligne est rejetée
+                db.session.rollback()
+                errors.append({"line": line_no, "error": str(getattr(e, 'orig', None) or e)})
+            if len(batch) >= BULK_BATCH_SIZE:
+                inserted += ingest.insert_batch(batch, errors)
+                batch = []
+        if batch:
+            inserted += ingest.insert_batch(batch, errors)
+    finally:
+        # paquets déjà commités : le cache est invalidé même si l'import s'interrompt
+        if inserted:
+            cache.bump("complaints")
+    return jsonify({"inserted": inserted, "error_count": errors.count, "errors": errors}), 200
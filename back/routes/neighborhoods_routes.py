@@ -1,15 +1,19 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, abort, request, jsonify
+from sqlalchemy import func
 from models.neighborhoods import db, Neighborhood
-from models.complaints    import Complaint
+from models.complaint_counts import ComplaintCount
+from services import cache, geo
 
 neighborhood_bp = Blueprint('neighborhood_bp', __name__)
 
 @neighborhood_bp.route('/neighborhoods', methods=['GET'])
+@cache.cached("neighborhoods")
 def get_neighborhoods():
     neighborhoods = Neighborhood.query.all()
     return jsonify([{"id": u.id, "name": u.name} for u in neighborhoods])
 
 @neighborhood_bp.route('/neighborhoods/<int:neighborhood_id>', methods=['GET'])
+@cache.cached("neighborhoods")
 def get_neighborhood(neighborhood_id):
     neighborhood = Neighborhood.query.get(neighborhood_id)
     return jsonify({
@@ -19,12 +23,17 @@ def get_neighborhood(neighborhood_id):
     })
 
 @neighborhood_bp.route('/neighborhoods/<int:neighborhood_id>/crime_count', methods=['GET'])
+@cache.cached("complaints", "neighborhoods")
 def get_crime_count(neighborhood_id):
     n = Neighborhood.query.get(neighborhood_id)
     if not n:
         abort(404, "Neighborhood not found")
-    count = Complaint.query.filter_by(neighborhood_id=neighborhood_id).count()
-    return jsonify({"neighborhood_id": neighborhood_id, "count": count}), 200
+    count = (
+        db.session.query(func.coalesce(func.sum(ComplaintCount.count), 0))
+        .filter(ComplaintCount.neighborhood_id == neighborhood_id)
+        .scalar()
+    )
+    return jsonify({"neighborhood_id": neighborhood_id, "count": int(count)}), 200
 
 @neighborhood_bp.route('/neighborhoods', methods=['POST'])
 def create_neighborhood():
@@ -32,4 +41,6 @@ def create_neighborhood():
     neighborhood = Neighborhood(name=data['name'])
     db.session.add(neighborhood)
     db.session.commit()
+    geo.forget_neighborhoods()
+    cache.bump("neighborhoods")
     return jsonify({"message": "Neighborhood created", "id": neighborhood.id}), 201
@@ -0,0 +1,93 @@
+from datetime import date, timedelta
+from flask import Blueprint, abort, current_app, request, jsonify
+from sqlalchemy import func
+from models.neighborhoods import db, Neighborhood
+from models.forecasts import Forecast
+from services import cache, live_window, predictions
+
+prediction_bp = Blueprint('prediction_bp', __name__)
+
+
+def _forecasts_generation():
+    """Table réécrite par build_forecasts.py depuis un autre processus : nombre de lignes + dernier ajout."""
+    return tuple(db.session.query(func.count(), func.max(Forecast.created_at)).one())
+
+
+cache.register("forecasts", _forecasts_generation)
+
+
+def _neighborhood(value):
+    """Paramètre `neighborhood` : id ou nom (NTAName) du quartier → (id ou None, nom)."""
+    if value.isdigit():
+        n = db.session.get(Neighborhood, int(value))
+        if not n:
+            abort(404, "Neighborhood not found")
+        return n.id, n.name
+    name = value.strip()
+    return db.session.query(Neighborhood.id).filter_by(name=name).scalar(), name
+
+
+def _payload(name, day, model, counts):
+    """counts : {code: nombre prévu} → réponse JSON (codes à 0 omis, plus fréquents d'abord)."""
+    ranked = sorted(((c, int(n)) for c, n in counts.items() if n > 0), key=lambda cn: (-cn[1], cn[0]))
+    return jsonify({
+        "neighborhood": name,
+        "date": day.isoformat(),
+        "model": model,
+        "total": sum(n for _, n in ranked),
+        "predictions": [
+            {"code": code, "crime_type": predictions.code_name(code), "count": n}
+            for code, n in ranked
+        ],
+    })
+
+
+def _predictor(model):
+    try:
+        predictor = predictions.get_predictor()
+    except (ImportError, OSError):
+        current_app.logger.exception("Prediction service unavailable")
+        abort(503, "Predictions are not available")
+    if model not in predictor.available():
+        abort(503, f"Model {model} is not available")
+    return predictor
+
+
+@prediction_bp.route('/predictions', methods=['GET'])
+@cache.cached("complaints", "forecasts")
+def get_predictions():
+    neighborhood = request.args.get('neighborhood', '')
+    day = request.args.get('date', '')
+    model = request.args.get('model', 'lgbm')
+    if not neighborhood or not day:
+        abort(400, "neighborhood and date are required")
+    if model not in predictions.BACKENDS:
+        abort(400, f"model must be one of {', '.join(predictions.BACKENDS)}")
+    try:
+        day = date.fromisoformat(day)
+    except ValueError:
+        abort(400, "date must be YYYY-MM-DD")
+    neighborhood_id, name = _neighborhood(neighborhood)
+
+    # demain, modèles séquentiels : fenêtre en direct, à jour des plaintes insérées par l'API
+    if model != 'lgbm' and neighborhood_id is not None and day == date.today() + timedelta(days=1):
+        predictor = _predictor(model)
+        window = live_window.get_window().features(neighborhood_id)
+        try:
+            pred = predictor.predict_window(name, window, model)
+        except ValueError as e:
+            abort(404, str(e))
+        return _payload(name, day, model, dict(zip(pred['code'], pred[f'prediction_{model}'])))
+
+    # prévision précalculée par build_forecasts.py
+    if neighborhood_id is not None:
+        forecast = db.session.get(Forecast, (neighborhood_id, day, model))
+        if forecast is not None:
+            return _payload(name, day, model, forecast.counts)
+
+    predictor = _predictor(model)
+    try:
+        pred = predictor.predict(name, day.isoformat(), model)
+    except ValueError as e:
+        abort(404, str(e))
+    return _payload(name, day, model, dict(zip(pred['code'], pred[f'prediction_{model}'])))
@@ -1,12 +1,19 @@
 # back/seed_db.py
 
-import os, sys, csv
+import os, io, sys, csv, time, argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
 from flask import Flask
+from sqlalchemy import insert
 from extensions import db
 from models.neighborhoods import Neighborhood
-from models.complaints    import Complaint
+from models.complaints    import Complaint, ENCODED_COLUMNS
+from models.import_checkpoints import ImportCheckpoint
 from config import Config
 from datetime import datetime
+from services import geo, lookups, rollup
 
 # 1) Init Flask + SQLAlchemy
 app = Flask(__name__)
@@ -19,9 +26,9 @@ CSV_PATH = os.path.abspath(os.path.join(
     HERE, '..', 'webapp', 'citysafe', 'public',
     'NYPD_with_NTAName_from_latlon.csv'
 ))
-if not os.path.exists(CSV_PATH):
-    print("❌ CSV introuvable :", CSV_PATH)
-    sys.exit(1)
+
+# Jointure spatiale du CSV brut NYPD (dataset/add_geo_zones_to_dataset.py)
+sys.path.insert(0, os.path.abspath(os.path.join(HERE, '..', 'dataset')))
 
 def safe_int(val):
     try:
@@ -41,10 +48,13 @@ def parse_date(val):
     except Exception:
         return None
 
-def main():
+def load_orm():
+    """Import historique : un objet Complaint par ligne, une seule transaction."""
     with app.app_context():
-        # — 3) Extraire tous les quartiers uniques + leur boro
+        # — 3) Extraire tous les quartiers uniques + leur boro, et les valeurs
+        #       distinctes des colonnes encodées
         nta_to_boro = {}
+        distinct = {kind: set() for kind in ENCODED_COLUMNS}
         with open(CSV_PATH, newline='', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
@@ -52,8 +62,17 @@ def main():
                 boro = row.get('BORO_NM', '').strip() or 'Unknown'
                 if name and name not in nta_to_boro:
                     nta_to_boro[name] = boro
+                for kind in ENCODED_COLUMNS:
+                    distinct[kind].add(row.get(kind.upper()))
         print(f"⚙️  {len(nta_to_boro)} quartiers uniques détectés")
 
+        # encodées avant tout ajout à la session : l'INSERT de lookups.encode
+        # passe par sa propre connexion (verrou SQLite sinon)
+        codes = {
+            kind: {v: lookups.encode(kind, v) for v in values}
+            for kind, values in distinct.items()
+        }
+
         # — 4) Insérer ou récupérer ces quartiers en base
         for name, boro in nta_to_boro.items():
             q = Neighborhood.query.filter_by(name=name).first()
@@ -65,10 +84,11 @@ def main():
 
         # — 5) Construire le mapping name → id
         mapping = {q.name: q.id for q in Neighborhood.query.all()}
+        index = geo.get_index()
 
         # — 6) Insertion des plaintes (bulk streaming)
         print("⚙️  Insertion des plaintes…")
-        count = 0
+        count = added = 0
         with open(CSV_PATH, newline='', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
@@ -77,43 +97,47 @@ def main():
                     comp = Complaint(
                         cmplnt_num          = row.get('CMPLNT_NUM'),
                         addr_pct_cd         = safe_int(row.get('ADDR_PCT_CD')),
-                        boro_nm             = row.get('BORO_NM'),
+                        boro_nm_id          = codes['boro_nm'][row.get('BORO_NM')],
                         cmplnt_fr_dt        = parse_date(row.get('CMPLNT_FR_DT')),
                         cmplnt_fr_tm        = row.get('CMPLNT_FR_TM'),
                         cmplnt_to_dt        = parse_date(row.get('CMPLNT_TO_DT')),
                         cmplnt_to_tm        = row.get('CMPLNT_TO_TM'),
-                        crm_atpt_cptd_cd    = row.get('CRM_ATPT_CPTD_CD'),
+                        crm_atpt_cptd_cd_id = codes['crm_atpt_cptd_cd'][row.get('CRM_ATPT_CPTD_CD')],
                         hadevelopt          = row.get('HADEVELOPT'),
                         housing_psa         = safe_int(row.get('HOUSING_PSA')),
                         jurisdiction_code   = safe_int(row.get('JURISDICTION_CODE')),
-                        juris_desc          = row.get('JURIS_DESC'),
+                        juris_desc_id       = codes['juris_desc'][row.get('JURIS_DESC')],
                         ky_cd               = safe_int(row.get('KY_CD')),
-                        law_cat_cd          = row.get('LAW_CAT_CD'),
-                        loc_of_occur_desc   = row.get('LOC_OF_OCCUR_DESC'),
-                        ofns_desc           = row.get('OFNS_DESC'),
+                        law_cat_cd_id       = codes['law_cat_cd'][row.get('LAW_CAT_CD')],
+                        loc_of_occur_desc_id = codes['loc_of_occur_desc'][row.get('LOC_OF_OCCUR_DESC')],
+                        ofns_desc_id        = codes['ofns_desc'][row.get('OFNS_DESC')],
                         parks_nm            = row.get('PARKS_NM'),
-                        patrol_boro         = row.get('PATROL_BORO'),
+                        patrol_boro_id      = codes['patrol_boro'][row.get('PATROL_BORO')],
                         pd_cd               = safe_int(row.get('PD_CD')),
-                        pd_desc             = row.get('PD_DESC'),
-                        prem_typ_desc       = row.get('PREM_TYP_DESC'),
-                        rpt_dt              = row.get('RPT_DT'),
+                        pd_desc_id          = codes['pd_desc'][row.get('PD_DESC')],
+                        prem_typ_desc_id    = codes['prem_typ_desc'][row.get('PREM_TYP_DESC')],
+                        rpt_dt              = parse_date(row.get('RPT_DT')),
                         station_name        = row.get('STATION_NAME'),
-                        susp_age_group      = row.get('SUSP_AGE_GROUP'),
-                        susp_race           = row.get('SUSP_RACE'),
-                        susp_sex            = row.get('SUSP_SEX'),
+                        susp_age_group_id   = codes['susp_age_group'][row.get('SUSP_AGE_GROUP')],
+                        susp_race_id        = codes['susp_race'][row.get('SUSP_RACE')],
+                        susp_sex_id         = codes['susp_sex'][row.get('SUSP_SEX')],
                         transit_district    = safe_int(row.get('TRANSIT_DISTRICT')),
-                        vic_age_group       = row.get('VIC_AGE_GROUP'),
-                        vic_race            = row.get('VIC_RACE'),
-                        vic_sex             = row.get('VIC_SEX'),
+                        vic_age_group_id    = codes['vic_age_group'][row.get('VIC_AGE_GROUP')],
+                        vic_race_id         = codes['vic_race'][row.get('VIC_RACE')],
+                        vic_sex_id          = codes['vic_sex'][row.get('VIC_SEX')],
                         x_coord_cd          = safe_int(row.get('X_COORD_CD')),
                         y_coord_cd          = safe_int(row.get('Y_COORD_CD')),
                         latitude            = safe_float(row.get('Latitude')),
                         longitude           = safe_float(row.get('Longitude')),
                         lat_lon             = row.get('Lat_Lon'),
                         geocoded_column     = row.get('New Georeferenced Column'),
-                        neighborhood_id     = mapping.get(row.get('NTAName', '').strip())
+                        neighborhood_id     = mapping.get(
+                            row.get('NTAName', '').strip()
+                            or (index and index.lookup(safe_float(row.get('Longitude')), safe_float(row.get('Latitude'))))
+                        )
                     )
                     db.session.add(comp)
+                    added += 1
                 except Exception as e:
                     print(f"⚠️ Ligne {count} ignorée: {e}")
 
@@ -123,7 +147,283 @@ def main():
                     print(f"    flush à {count}")
 
         db.session.commit()
-        print(f"✅ Import terminé : {count} plaintes ajoutées.")
+        print(f"✅ Import terminé : {added} plaintes ajoutées ({count - added} lignes ignorées).")
+
+        # — 7) Recalcul du rollup quartier × infraction × jour
+        n = rollup.rebuild()
+        print(f"  → Rollup complaint_counts reconstruit ({n} lignes)")
+
+# -----------------------------------------------------------------------------
+# Import bulk : lecture pandas par paquets, conversions par colonne,
+# INSERT executemany (Core) et commit + checkpoint par paquet.
+# -----------------------------------------------------------------------------
+CHUNK_SIZE = 50_000
+
+# colonne CSV → colonne de la table complaints
+TEXT_COLUMNS = {
+    'CMPLNT_NUM': 'cmplnt_num', 'BORO_NM': 'boro_nm', 'CMPLNT_FR_TM': 'cmplnt_fr_tm',
+    'CMPLNT_TO_TM': 'cmplnt_to_tm', 'CRM_ATPT_CPTD_CD': 'crm_atpt_cptd_cd',
+    'HADEVELOPT': 'hadevelopt', 'JURIS_DESC': 'juris_desc', 'LAW_CAT_CD': 'law_cat_cd',
+    'LOC_OF_OCCUR_DESC': 'loc_of_occur_desc', 'OFNS_DESC': 'ofns_desc', 'PARKS_NM': 'parks_nm',
+    'PATROL_BORO': 'patrol_boro', 'PD_DESC': 'pd_desc', 'PREM_TYP_DESC': 'prem_typ_desc',
+    'STATION_NAME': 'station_name', 'SUSP_AGE_GROUP': 'susp_age_group', 'SUSP_RACE': 'susp_race',
+    'SUSP_SEX': 'susp_sex', 'VIC_AGE_GROUP': 'vic_age_group', 'VIC_RACE': 'vic_race',
+    'VIC_SEX': 'vic_sex', 'Lat_Lon': 'lat_lon', 'New Georeferenced Column': 'geocoded_column',
+}
+INT_COLUMNS = {
+    'ADDR_PCT_CD': 'addr_pct_cd', 'HOUSING_PSA': 'housing_psa',
+    'JURISDICTION_CODE': 'jurisdiction_code', 'KY_CD': 'ky_cd', 'PD_CD': 'pd_cd',
+    'TRANSIT_DISTRICT': 'transit_district', 'X_COORD_CD': 'x_coord_cd', 'Y_COORD_CD': 'y_coord_cd',
+}
+FLOAT_COLUMNS = {'Latitude': 'latitude', 'Longitude': 'longitude'}
+DATE_COLUMNS = {'CMPLNT_FR_DT': 'cmplnt_fr_dt', 'CMPLNT_TO_DT': 'cmplnt_to_dt', 'RPT_DT': 'rpt_dt'}
+SOURCE_COLUMNS = {**TEXT_COLUMNS, **INT_COLUMNS, **FLOAT_COLUMNS, **DATE_COLUMNS}
+
+
+def _column(chunk, src):
+    return chunk[src] if src in chunk else pd.Series('', index=chunk.index)
+
+
+def parse_chunk(chunk):
+    """
+    Équivalent vectorisé de safe_int / safe_float / parse_date, sans accès à
+    la base : renvoie un DataFrame typé (Int64, float64, datetime64, str).
+    """
+    out = pd.DataFrame(index=chunk.index)
+    for src, col in TEXT_COLUMNS.items():
+        out[col] = _column(chunk, src)
+    for src, col in INT_COLUMNS.items():
+        values = pd.to_numeric(_column(chunk, src), errors='coerce')
+        out[col] = np.trunc(values).astype('Int64')
+    for src, col in FLOAT_COLUMNS.items():
+        out[col] = pd.to_numeric(_column(chunk, src), errors='coerce')
+    for src, col in DATE_COLUMNS.items():
+        out[col] = pd.to_datetime(_column(chunk, src), format='%m/%d/%Y', errors='coerce')
+    out['NTAName'] = _column(chunk, 'NTAName').str.strip()
+    return out
+
+
+def to_records(frame, mapping):
+    """
+    Lignes d'un paquet typé → dicts prêts pour un INSERT executemany
+    (colonnes catégorielles encodées, quartiers inconnus créés).
+    """
+    out = frame.drop(columns=['NTAName', *ENCODED_COLUMNS])
+    for kind in ENCODED_COLUMNS:
+        # une résolution par valeur distincte du paquet, pas par ligne
+        codes = {v: lookups.encode(kind, v) for v in frame[kind].unique()}
+        out[f'{kind}_id'] = frame[kind].map(codes).astype('Int64')
+    resolve_neighborhoods(frame)
+    # après l'encodage : les lookups s'écrivent hors de la transaction du paquet
+    sync_neighborhoods(frame, mapping)
+    out['neighborhood_id'] = frame['NTAName'].map(mapping).astype('Int64')
+    out = out.astype(object).where(out.notna(), None)
+    for col in DATE_COLUMNS.values():
+        out[col] = [d.date() if d is not None else None for d in out[col]]
+    return out.to_dict('records')
+
+
+def resolve_neighborhoods(frame):
+    """NTAName vide mais coordonnées présentes → quartier déduit de l'index spatial."""
+    missing = (frame['NTAName'] == '') & frame['latitude'].notna() & frame['longitude'].notna()
+    if not missing.any():
+        return
+    index = geo.get_index()
+    if index is None:
+        return
+    names = index.lookup_many(frame.loc[missing, 'longitude'], frame.loc[missing, 'latitude'])
+    frame.loc[missing, 'NTAName'] = [name or '' for name in names]
+
+
+def sync_neighborhoods(frame, mapping):
+    """Crée les quartiers du paquet encore inconnus et complète `mapping`."""
+    names = frame['NTAName']
+    boros = frame['boro_nm'].str.strip().replace('', 'Unknown')
+    new = (
+        pd.DataFrame({'name': names, 'boro': boros})
+          .loc[(names != '') & ~names.isin(list(mapping))]
+          .drop_duplicates('name')
+    )
+    if new.empty:
+        return
+    for name, boro in new.itertuples(index=False):
+        q = Neighborhood(name=name, boro=boro)
+        db.session.add(q)
+        db.session.flush()
+        mapping[name] = q.id
+
+
+def _load_checkpoint(source, restart):
+    # les plaintes ne gardent pas leur fichier source : repartir du début sur
+    # une table non vide dupliquerait les lignes déjà importées
+    if restart and db.session.query(Complaint.id).limit(1).scalar() is not None:
+        sys.exit("❌ --restart : la table complaints n'est pas vide, la vider avant de réimporter")
+    checkpoint = db.session.get(ImportCheckpoint, source)
+    if checkpoint is None or restart:
+        checkpoint = db.session.merge(ImportCheckpoint(source=source, rows=0, offset=0))
+        db.session.commit()
+    if checkpoint.rows:
+        print(f"↻ Reprise après {checkpoint.rows} lignes déjà importées")
+    return checkpoint
+
+
+def _write_batches(batches, checkpoint):
+    """
+    Écrivain unique : insère les paquets typés dans l'ordre et commite chacun
+    avec le checkpoint (lignes + offset d'octets atteint) dans la même transaction.
+    `batches` produit des couples (DataFrame typé, offset de fin ou None).
+    """
+    mapping = {q.name: q.id for q in Neighborhood.query.all()}
+    table = Complaint.__table__
+    start = time.perf_counter()
+    imported = 0
+    for frame, offset in batches:
+        t0 = time.perf_counter()
+        records = to_records(frame, mapping)
+        if records:
+            db.session.execute(insert(table), records)
+        checkpoint.rows += len(records)
+        if offset is not None:
+            checkpoint.offset = offset
+        db.session.commit()
+
+        imported += len(records)
+        elapsed = time.perf_counter() - t0
+        print(f"    {checkpoint.rows} lignes "
+              f"({len(records) / elapsed:,.0f} lignes/s, "
+              f"moyenne {imported / (time.perf_counter() - start):,.0f} lignes/s)")
+
+    total = time.perf_counter() - start
+    print(f"✅ Import terminé : {imported} plaintes ajoutées en {total:.1f}s "
+          f"({imported / max(total, 1e-9):,.0f} lignes/s).")
+
+    n = rollup.rebuild()
+    print(f"  → Rollup complaint_counts reconstruit ({n} lignes)")
+
+
+def load_bulk(chunk_size=CHUNK_SIZE, restart=False):
+    with app.app_context():
+        checkpoint = _load_checkpoint(os.path.basename(CSV_PATH), restart)
+        reader = pd.read_csv(
+            CSV_PATH, dtype=str, keep_default_na=False, na_filter=False,
+            chunksize=chunk_size, skiprows=range(1, checkpoint.rows + 1),
+        )
+        _write_batches(((parse_chunk(chunk), None) for chunk in reader), checkpoint)
+
+
+# -----------------------------------------------------------------------------
+# Import parallèle : le fichier est découpé en plages d'octets alignées sur les
+# fins de ligne, parsées par des processus workers ; l'écrivain consomme les
+# paquets dans l'ordre du fichier. Suppose qu'aucun champ ne contient de
+# retour à la ligne (c'est le cas de l'export NYPD).
+# -----------------------------------------------------------------------------
+SHARD_BYTES = 16 * 1024 * 1024
+
+
+def shard_ranges(path, start, shard_bytes=SHARD_BYTES):
+    """Plages [début, fin) d'octets de `start` à la fin du fichier, coupées en fin de ligne."""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        while start < size:
+            f.seek(min(start + shard_bytes, size))
+            f.readline()  # on termine la ligne en cours
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_shard(args):
+    """Worker : lit une plage d'octets du CSV et renvoie (paquet typé, offset de fin)."""
+    path, header, start, end = args
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    chunk = pd.read_csv(
+        io.BytesIO(data), names=header, header=None, dtype=str,
+        keep_default_na=False, na_filter=False,
+    )
+    return parse_chunk(chunk), end
+
+
+def load_parallel(workers, shard_bytes=SHARD_BYTES, restart=False):
+    with app.app_context():
+        checkpoint = _load_checkpoint(os.path.basename(CSV_PATH), restart)
+        if checkpoint.rows and not checkpoint.offset:
+            sys.exit("❌ Checkpoint créé par le mode bulk : reprendre avec --mode bulk ou --restart")
+
+        with open(CSV_PATH, 'rb') as f:
+            header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+            first_row = f.tell()
+
+        ranges = shard_ranges(CSV_PATH, max(checkpoint.offset, first_row), shard_bytes)
+        print(f"⚙️  {len(ranges)} plages à parser avec {workers} workers")
+        tasks = [(CSV_PATH, header, start, end) for start, end in ranges]
+
+        def batches(pool):
+            # au plus 2 paquets d'avance par worker pour borner la mémoire
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(parse_shard, task))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            _write_batches(batches(pool), checkpoint)
+
+
+def load_raw(raw_path, chunk_size=CHUNK_SIZE, workers=0, restart=False):
+    """
+    Import direct du CSV brut NYPD (sans NTAName) : les paquets de la jointure
+    spatiale sont insérés au fil de l'eau, sans CSV intermédiaire.
+    """
+    from add_geo_zones_to_dataset import iter_joined_chunks
+    # seules les colonnes lues par parse_chunk (les absentes y restent vides)
+    with open(raw_path, newline='', encoding='utf-8-sig') as f:
+        header = next(csv.reader(f))
+    usecols = [c for c in header if c in SOURCE_COLUMNS]
+    with app.app_context():
+        checkpoint = _load_checkpoint(os.path.basename(raw_path), restart)
+        chunks = iter_joined_chunks(
+            raw_path, app.config['NEIGHBORHOODS_GEOJSON'], chunk_size, workers,
+            usecols=usecols, skiprows=checkpoint.rows,
+        )
+        _write_batches(((parse_chunk(chunk), None) for chunk in chunks), checkpoint)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import du CSV NYPD dans la base")
+    parser.add_argument('--mode', choices=('bulk', 'orm'), default='bulk',
+                        help="bulk : paquets pandas + executemany (défaut), orm : ancien import ligne à ligne")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=0,
+                        help="processus de parsing (mode bulk) ou de jointure spatiale (--from-raw) ; 0 = dans le processus principal")
+    parser.add_argument('--shard-mb', type=int, default=SHARD_BYTES // (1024 * 1024),
+                        help="taille des plages d'octets données aux workers")
+    parser.add_argument('--restart', action='store_true',
+                        help="ignore le checkpoint et repart du début du fichier "
+                             "(table complaints à vider au préalable : les lignes ne sont pas supprimées)")
+    parser.add_argument('--from-raw', metavar='CSV',
+                        help="CSV brut NYPD : quartiers déduits des coordonnées pendant l'import")
+    args = parser.parse_args()
+
+    if args.from_raw:
+        load_raw(args.from_raw, args.chunk_size, args.workers, args.restart)
+        return
+    if not os.path.exists(CSV_PATH):
+        print("❌ CSV introuvable :", CSV_PATH)
+        sys.exit(1)
+
+    if args.mode == 'orm':
+        load_orm()
+    elif args.workers > 0:
+        load_parallel(args.workers, args.shard_mb * 1024 * 1024, args.restart)
+    else:
+        load_bulk(args.chunk_size, args.restart)
+
 
 if __name__ == '__main__':
     main()
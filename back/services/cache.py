@@ -0,0 +1,102 @@
+"""
+Cache en lecture des réponses GET des blueprints API.
+
+Les entrées sont indexées par endpoint + paramètres + générations des données
+dont dépend la réponse. Les POST incrémentent la génération concernée
+(`bump`), ce qui rend caduques les entrées existantes sans avoir à les
+parcourir ; elles sortent ensuite du cache par LRU ou par TTL.
+Chaque réponse porte un ETag fort pour permettre les 304 côté client.
+
+Le cache est local au processus : avec plusieurs workers, seul celui qui a
+traité l'écriture est invalidé immédiatement, les autres le sont par TTL.
+Pour des données écrites par un autre processus (build_forecasts.py), un
+scope peut être enregistré avec une sonde (`register`) : sa génération est
+alors relue à chaque requête au lieu d'être incrémentée par `bump`.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL = 300  # secondes
+
+_generations = {"complaints": 0, "neighborhoods": 0}
+_probes = {}   # scope → fonction sans argument renvoyant sa génération
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+
+def register(scope, probe):
+    """Scope dont la génération est lue par `probe()` (valeur hashable) à chaque requête."""
+    _probes[scope] = probe
+
+
+def generation(scope):
+    probe = _probes.get(scope)
+    return probe() if probe is not None else _generations[scope]
+
+
+def bump(*scopes):
+    """Invalide toutes les réponses qui dépendent de `scopes`."""
+    with _lock:
+        for scope in scopes:
+            _generations[scope] += 1
+
+
+def _get(key, ttl):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > ttl:
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return entry
+
+
+def _put(key, entry, max_entries):
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > max_entries:
+            _entries.popitem(last=False)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def cached(*scopes):
+    """Décorateur de vue GET : réponse mise en cache + ETag / 304."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            key = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                tuple(generation(s) for s in scopes),
+            )
+            entry = _get(key, config.get("CACHE_TTL", DEFAULT_TTL))
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                entry = (time.monotonic(), body, response.mimetype, hashlib.sha1(body).hexdigest())
+                _put(key, entry, config.get("CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+            _, body, mimetype, etag = entry
+            response = current_app.response_class(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
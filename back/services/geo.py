@@ -0,0 +1,154 @@
+"""
+Index spatial des quartiers (neighborhoods.geojson) pour retrouver le
+quartier d'un point lon/lat à l'ingestion, sans jointure geopandas.
+
+L'emprise des polygones est découpée en grille régulière. Chaque cellule est
+classée une fois au chargement : vide, entièrement contenue dans un seul
+quartier (réponse directe, sans géométrie) ou frontière (test exact
+point-dans-polygone sur les seuls quartiers qui la touchent). Le prédicat est
+celui de la jointure du dataset (`within`) : un point sur une limite n'a pas
+de quartier.
+"""
+import json
+import math
+import os
+import threading
+
+import numpy as np
+import shapely
+from shapely.geometry import shape
+from shapely.strtree import STRtree
+from flask import current_app
+from sqlalchemy import select
+
+from extensions import db
+from models.neighborhoods import Neighborhood
+
+GRID_SIZE = 256   # cellules par côté
+
+EMPTY = -1
+BOUNDARY = -2
+
+
+class NeighborhoodIndex:
+    def __init__(self, features, grid_size=GRID_SIZE):
+        features = [f for f in features if f.get('geometry')]
+        self.names = np.array([f['properties']['NTAName'].strip() for f in features], dtype=object)
+        self.polygons = np.array([shape(f['geometry']) for f in features], dtype=object)
+        shapely.prepare(self.polygons)
+
+        minx, miny, maxx, maxy = shapely.total_bounds(self.polygons)
+        self.origin = (minx, miny)
+        self.step = ((maxx - minx) / grid_size, (maxy - miny) / grid_size)
+        self.size = grid_size
+
+        # cellules de la grille, ligne par ligne (j = latitude, i = longitude)
+        i, j = np.meshgrid(np.arange(grid_size), np.arange(grid_size))
+        x0 = minx + i.ravel() * self.step[0]
+        y0 = miny + j.ravel() * self.step[1]
+        cells = shapely.box(x0, y0, x0 + self.step[0], y0 + self.step[1])
+
+        tree = STRtree(self.polygons)
+        self.cells = np.full(grid_size * grid_size, EMPTY, dtype=np.int32)
+
+        cell_idx, poly_idx = tree.query(cells, predicate='intersects')
+        self.cells[cell_idx] = BOUNDARY
+        inside_cell, inside_poly = tree.query(cells, predicate='within')
+        self.cells[inside_cell] = inside_poly
+
+        # candidats des cellules frontière : cellule → indices de polygones
+        boundary = self.cells[cell_idx] == BOUNDARY
+        self.candidates = {}
+        for c, p in zip(cell_idx[boundary], poly_idx[boundary]):
+            self.candidates.setdefault(int(c), []).append(int(p))
+
+    @classmethod
+    def from_file(cls, path, grid_size=GRID_SIZE):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)['features'], grid_size)
+
+    def _cell(self, lon, lat):
+        i = np.floor((lon - self.origin[0]) / self.step[0])
+        j = np.floor((lat - self.origin[1]) / self.step[1])
+        valid = (i >= 0) & (i < self.size) & (j >= 0) & (j < self.size)
+        return np.where(valid, j * self.size + i, -1).astype(np.int64)
+
+    def lookup(self, lon, lat):
+        """Nom du quartier contenant le point, ou None (aussi pour NaN / ±inf)."""
+        if lon is None or lat is None or not (math.isfinite(lon) and math.isfinite(lat)):
+            return None
+        i = math.floor((lon - self.origin[0]) / self.step[0])
+        j = math.floor((lat - self.origin[1]) / self.step[1])
+        if not (0 <= i < self.size and 0 <= j < self.size):
+            return None
+        cell = j * self.size + i
+        poly = self.cells[cell]
+        if poly >= 0:
+            return self.names[poly]
+        if poly == EMPTY:
+            return None
+        for p in self.candidates[cell]:
+            if shapely.contains_xy(self.polygons[p], lon, lat):
+                return self.names[p]
+        return None
+
+    def lookup_many(self, lons, lats):
+        """Version vectorisée : tableau de noms (None hors quartier ou coordonnées manquantes)."""
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        cell = self._cell(lons, lats)   # NaN → comparaisons fausses → -1
+        poly = np.where(cell >= 0, self.cells[np.maximum(cell, 0)], EMPTY)
+
+        for k in np.flatnonzero(poly == BOUNDARY):
+            poly[k] = EMPTY
+            for p in self.candidates[int(cell[k])]:
+                if shapely.contains_xy(self.polygons[p], lons[k], lats[k]):
+                    poly[k] = p
+                    break
+
+        out = np.full(len(poly), None, dtype=object)
+        found = poly >= 0
+        out[found] = self.names[poly[found]]
+        return out
+
+
+_index = None
+_index_path = None
+_ids = {}   # nom → id du quartier en base (None : absent de la table)
+_lock = threading.Lock()
+
+
+def get_index():
+    """Index chargé une fois par processus ; None si le GeoJSON est absent."""
+    global _index, _index_path
+    path = current_app.config['NEIGHBORHOODS_GEOJSON']
+    with _lock:
+        if _index_path != path:
+            _index_path = path
+            if os.path.exists(path):
+                _index = NeighborhoodIndex.from_file(path)
+            else:
+                _index = None
+                current_app.logger.warning("GeoJSON des quartiers introuvable : %s", path)
+        return _index
+
+
+def neighborhood_id(lon, lat):
+    """Id du quartier (en base) contenant le point, ou None."""
+    index = get_index()
+    name = index.lookup(lon, lat) if index is not None else None
+    if name is None:
+        return None
+    if name not in _ids:
+        rows = db.session.execute(select(Neighborhood.name, Neighborhood.id)).all()
+        with _lock:
+            _ids.update(rows)
+            # absence mémorisée aussi : la table n'est pas relue à chaque point
+            _ids.setdefault(name, None)
+    return _ids.get(name)
+
+
+def forget_neighborhoods():
+    """Correspondance nom → id à relire (quartiers créés)."""
+    with _lock:
+        _ids.clear()
@@ -0,0 +1,105 @@
+"""
+Correspondance champs JSON → colonnes de `complaints`, partagée par
+POST /complaints et POST /complaints/bulk, et insertion par paquets.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from extensions import db
+from models.complaints import Complaint
+from services import geo, live_window, lookups, rollup, tiles
+
+TEXT_FIELDS = (
+    'cmplnt_num', 'cmplnt_fr_tm', 'cmplnt_to_tm', 'hadevelopt', 'parks_nm',
+    'station_name', 'lat_lon', 'geocoded_column',
+)
+INT_FIELDS = (
+    'addr_pct_cd', 'housing_psa', 'jurisdiction_code', 'ky_cd', 'pd_cd',
+    'transit_district', 'x_coord_cd', 'y_coord_cd', 'neighborhood_id',
+)
+FLOAT_FIELDS = ('latitude', 'longitude')
+DATE_FIELDS = ('cmplnt_fr_dt', 'cmplnt_to_dt', 'rpt_dt')
+
+
+def _empty(value):
+    return value is None or (isinstance(value, str) and value.strip() in ('', 'NaN'))
+
+
+def _to_int(value):
+    return None if _empty(value) else int(float(value))
+
+
+def _to_float(value):
+    return None if _empty(value) else float(value)
+
+
+def _to_date(value):
+    if _empty(value):
+        return None
+    if isinstance(value, (date, datetime)):
+        return value
+    value = str(value).strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, '%m/%d/%Y')
+
+
+def complaint_values(data):
+    """
+    Champs JSON d'une plainte → valeurs typées des colonnes (colonnes
+    catégorielles encodées, quartier déduit des coordonnées s'il manque).
+    Lève ValueError si un champ n'est pas convertible.
+    """
+    values = {f: data.get(f) for f in TEXT_FIELDS}
+    for fields, convert in ((INT_FIELDS, _to_int), (FLOAT_FIELDS, _to_float), (DATE_FIELDS, _to_date)):
+        for f in fields:
+            try:
+                values[f] = convert(data.get(f))
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid value for {f}: {data.get(f)!r}")
+    for f in ('cmplnt_fr_dt', 'cmplnt_to_dt'):
+        if isinstance(values[f], datetime):
+            values[f] = values[f].date()
+    if values['neighborhood_id'] is None and values['latitude'] is not None and values['longitude'] is not None:
+        values['neighborhood_id'] = geo.neighborhood_id(values['longitude'], values['latitude'])
+    values.update(lookups.encode_fields(data))
+    return values
+
+
+def insert_batch(batch, errors):
+    """
+    Insère un paquet [(n° de ligne, valeurs)] en un INSERT multi-lignes et met
+    à jour le rollup dans la même transaction, puis la fenêtre LSTM en direct
+et les agrégats des tuiles.
+    En cas d'erreur base, repli ligne par ligne pour isoler les lignes
+    fautives (ajoutées à `errors`).
+    Renvoie le nombre de lignes insérées.
+    """
+    table = Complaint.__table__
+    rows = [values for _, values in batch]
+    try:
+        db.session.execute(insert(table), rows)
+        rollup.record(rows)
+        db.session.commit()
+        live_window.record(rows)
+        tiles.record(rows)
+        return len(rows)
+    except SQLAlchemyError:
+        db.session.rollback()
+
+    inserted = 0
+    for line, values in batch:
+        try:
+            db.session.execute(insert(table), [values])
+            rollup.record([values])
+            db.session.commit()
+            live_window.record([values])
+            tiles.record([values])
+            inserted += 1
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            errors.append({"line": line, "error": str(getattr(e, 'orig', None) or e)})
+    return inserted
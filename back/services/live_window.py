@@ -0,0 +1,143 @@
+"""
+Fenêtre d'entrée du LSTM tenue à jour en direct, pour prévoir le lendemain.
+
+Pour chaque quartier, un tampon circulaire des WINDOW derniers jours
+(aujourd'hui compris) compte les plaintes par jour. Comme NB_INFRACTION dans
+build_dataset.py, seules les plaintes avec un code d'infraction (ky_cd)
+comptent. Il est amorcé depuis la table complaints (index date, quartier),
+incrémenté à chaque plainte insérée par l'API et
+décalé d'un cran à minuit (le jour sortant est écrasé par le nouveau jour, à
+zéro). Les features (NB_INFRACTION puis calendaires, comme le dataset) sont
+recalculées à la lecture ; la mise à l'échelle du training est appliquée par
+le Predictor (scaler_counts.pkl).
+
+Comme le cache, la fenêtre est locale au processus : avec plusieurs workers,
+les plaintes insérées par un autre worker n'y apparaissent qu'au prochain
+amorçage.
+"""
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func
+
+from extensions import db
+from models.complaints import Complaint
+from services.rollup import as_day
+
+WINDOW = 28   # cf. model/predict.py
+
+
+def calendar_features(days):
+    """dow, month, doy_sin, doy_cos de chaque jour (formules de build_dataset.py)."""
+    doy = np.array([d.timetuple().tm_yday for d in days], dtype=np.float64)
+    phase = 2 * np.pi * doy / 365
+    return np.column_stack([
+        [d.weekday() for d in days],
+        [d.month for d in days],
+        np.sin(phase),
+        np.cos(phase),
+    ])
+
+
+class LiveWindow:
+    """Compteurs (quartier, jour) des WINDOW derniers jours en tampons circulaires."""
+
+    def __init__(self, today, window=WINDOW):
+        self.window = window
+        self.today = today
+        self.head = 0                                   # case d'aujourd'hui
+        self.rows = {}                                  # id quartier → ligne de `counts`
+        self.counts = np.zeros((0, window), dtype=np.int32)
+        self._lock = threading.Lock()
+
+    def _roll(self, today):
+        """Passage à `today` : les cases des jours écoulés sont remises à zéro."""
+        shift = (today - self.today).days
+        if shift <= 0:
+            return
+        if shift >= self.window:
+            self.counts[:] = 0
+        else:
+            slots = (self.head + np.arange(1, shift + 1)) % self.window
+            self.counts[:, slots] = 0
+        self.head = (self.head + shift) % self.window
+        self.today = today
+
+    def _row(self, neighborhood_id):
+        row = self.rows.get(neighborhood_id)
+        if row is None:
+            row = self.rows[neighborhood_id] = len(self.rows)
+            if row >= len(self.counts):
+                grown = np.zeros((max(2 * len(self.counts), 64), self.window), dtype=np.int32)
+                grown[:len(self.counts)] = self.counts
+                self.counts = grown
+        return row
+
+    def add(self, counts, today=None):
+        """counts : {(id quartier, jour): nombre} ; jours hors fenêtre ignorés."""
+        with self._lock:
+            self._roll(today or date.today())
+            for (neighborhood_id, day), n in counts.items():
+                offset = (self.today - day).days
+                if 0 <= offset < self.window:
+                    row = self._row(neighborhood_id)   # peut réallouer `counts`
+                    self.counts[row, (self.head - offset) % self.window] += n
+
+    def days(self):
+        return [self.today - timedelta(days=offset) for offset in range(self.window - 1, -1, -1)]
+
+    def features(self, neighborhood_id, today=None):
+        """(WINDOW, 5) features non normalisées, du plus ancien jour à aujourd'hui."""
+        with self._lock:
+            self._roll(today or date.today())
+            row = self.rows.get(neighborhood_id)
+            order = (self.head + 1 + np.arange(self.window)) % self.window
+            counts = self.counts[row, order] if row is not None else np.zeros(self.window)
+            days = self.days()
+        return np.column_stack([counts, calendar_features(days)]).astype(np.float32)
+
+
+_live = None
+_live_lock = threading.Lock()
+
+
+def _seed(today):
+    """Fenêtre amorcée depuis les plaintes des WINDOW derniers jours."""
+    live = LiveWindow(today)
+    start = today - timedelta(days=WINDOW - 1)
+    rows = (
+        db.session.query(Complaint.neighborhood_id, Complaint.cmplnt_fr_dt, func.count())
+        .filter(Complaint.cmplnt_fr_dt.between(start, today),
+                Complaint.neighborhood_id.isnot(None), Complaint.ky_cd.isnot(None))
+        .group_by(Complaint.neighborhood_id, Complaint.cmplnt_fr_dt)
+    )
+    live.add({(nbh, as_day(day)): int(n) for nbh, day, n in rows}, today)
+    return live
+
+
+def get_window():
+    """Fenêtre partagée du processus, amorcée au premier appel (contexte d'app requis)."""
+    global _live
+    with _live_lock:
+        if _live is None:
+            _live = _seed(date.today())
+        return _live
+
+
+def record(complaints):
+    """
+    Compte des plaintes qui viennent d'être commitées (dicts de valeurs de
+    colonnes : les attributs d'un objet Complaint sont expirés au commit).
+    Sans effet tant que la fenêtre n'est pas amorcée : l'amorçage lira ces
+    plaintes en base.
+    """
+    if _live is None:
+        return
+    counts = Counter(
+        (r.get('neighborhood_id'), as_day(r.get('cmplnt_fr_dt')))
+        for r in complaints
+        if r.get('neighborhood_id') is not None and r.get('ky_cd') is not None
+    )
+    _live.add(counts)
@@ -0,0 +1,86 @@
+"""
+Cache mémoire du dictionnaire `lookups` (valeur catégorielle ↔ id).
+
+Les ids sont stables : une fois lue ou créée, une valeur reste en cache pour
+la vie du processus. Les nouvelles valeurs sont insérées dans une transaction
+à part, validée immédiatement, pour qu'un rollback de l'appelant ne laisse
+jamais en cache un id absent de la base. Appeler `encode` avant d'écrire
+dans la session (SQLite verrouille la base pendant une transaction d'écriture).
+"""
+import threading
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.complaints import ENCODED_COLUMNS
+from models.lookups import Lookup
+
+_ids = {}      # (kind, value) → id
+_values = {}   # id → value
+_lock = threading.Lock()
+
+
+def _remember(rows):
+    with _lock:
+        for id_, kind, value in rows:
+            _ids[(kind, value)] = id_
+            _values[id_] = value
+
+
+def _reload():
+    _remember(db.session.execute(select(Lookup.id, Lookup.kind, Lookup.value)).all())
+
+
+def decode(id_):
+    """id → valeur (None pour un id NULL ou inconnu)."""
+    if id_ is None:
+        return None
+    if id_ not in _values:
+        _reload()
+    return _values.get(id_)
+
+
+def encode(kind, value, create=True):
+    """
+    Valeur → id. Les valeurs vides sont encodées NULL. Si `create` est faux,
+    une valeur absente du dictionnaire renvoie None.
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    key = (kind, value)
+    if key in _ids:
+        return _ids[key]
+
+    row = db.session.execute(
+        select(Lookup.id).where(Lookup.kind == kind, Lookup.value == value)
+    ).first()
+    if row is None and create:
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(Lookup.__table__).values(kind=kind, value=value))
+        except IntegrityError:
+            pass  # créée entre-temps par un autre processus
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                select(Lookup.id).where(Lookup.kind == kind, Lookup.value == value)
+            ).first()
+    if row is None:
+        return None
+    _remember([(row[0], kind, value)])
+    return row[0]
+
+
+def encode_fields(data):
+    """{'ofns_desc': 'ROBBERY', …} → {'ofns_desc_id': 12, …} pour toutes les colonnes encodées."""
+    return {f"{kind}_id": encode(kind, data.get(kind)) for kind in ENCODED_COLUMNS}
+
+
+def values(kind):
+    """Toutes les valeurs connues d'une colonne encodée, triées."""
+    return sorted(
+        db.session.execute(select(Lookup.value).where(Lookup.kind == kind)).scalars()
+    )
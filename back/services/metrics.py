@@ -0,0 +1,227 @@
+"""
+Instrumentation des requêtes HTTP, exposée au format texte Prometheus sur
+/metrics.
+
+Par route (règle d'URL Flask, pas l'URL brute) et méthode :
+    http_requests_total                     requêtes par code HTTP
+    http_request_duration_seconds           latence de bout en bout
+    http_request_sql_queries                requêtes SQL émises par requête HTTP
+    http_request_sql_duration_seconds       temps passé en base par requête HTTP
+    http_response_size_bytes                taille du corps de la réponse
+    http_response_serialization_seconds     temps de sérialisation JSON
+
+Les requêtes SQL sont comptées par les événements `*_cursor_execute` du moteur
+SQLAlchemy, la sérialisation par le fournisseur JSON de l'app (jsonify,
+current_app.json.dumps). Pour une réponse en stream, le corps est produit
+après after_request : taille, SQL et sérialisation sont relevés à la fermeture
+de la réponse, sans la mettre en mémoire. Une
+requête qui dépasse METRICS_SLOW_REQUEST_MS ou METRICS_SLOW_REQUEST_QUERIES
+est journalisée (0 = pas de seuil).
+
+Comme le cache, les compteurs sont locaux au processus : avec plusieurs
+workers, chacun expose les siens.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, current_app, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+from extensions import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Histogramme Prometheus : une série de compteurs par jeu de labels."""
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.series = {}   # labels → [compte par seau (non cumulé)…, somme, total]
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            base = _labels(labels)
+            cumulative = 0
+            for bound, n in zip(self.buckets + ('+Inf',), series):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6g}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.series = {}
+
+    def inc(self, labels):
+        self.series[labels] = self.series.get(labels, 0) + 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{{{_labels(labels)}}} {n}" for labels, n in sorted(self.series.items())]
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    """((nom, valeur), …) → 'nom="valeur",…'"""
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+
+
+requests_total = Counter("http_requests_total", "Requêtes HTTP traitées.")
+duration = Histogram("http_request_duration_seconds", "Latence des requêtes HTTP.", LATENCY_BUCKETS)
+sql_queries = Histogram("http_request_sql_queries", "Requêtes SQL par requête HTTP.", QUERY_BUCKETS)
+sql_duration = Histogram("http_request_sql_duration_seconds", "Temps SQL par requête HTTP.", LATENCY_BUCKETS)
+response_size = Histogram("http_response_size_bytes", "Taille du corps des réponses.", SIZE_BUCKETS)
+serialization = Histogram("http_response_serialization_seconds", "Sérialisation JSON des réponses.",
+                          LATENCY_BUCKETS)
+METRICS = (requests_total, duration, sql_queries, sql_duration, response_size, serialization)
+
+
+# -- Collecte -------------------------------------------------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    stats = _stats()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql += elapsed
+
+
+def _handle_error(context):
+    # requête en échec : pas d'after_cursor_execute, on dépile quand même
+    if context.connection is not None and context.connection.info.get('query_start'):
+        context.connection.info['query_start'].pop()
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Fournisseur JSON par défaut, temps de dumps() cumulé sur la requête."""
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            stats = _stats()
+            if stats is not None:
+                stats.serialization += time.perf_counter() - start
+
+
+class _RequestStats:
+    """Mesures d'une requête ; survit au contexte pour les réponses en stream."""
+    __slots__ = ('start', 'queries', 'sql', 'serialization', 'size')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.serialization = 0.0
+        self.size = 0
+
+
+def _stats():
+    return g.get('metrics') if has_request_context() else None
+
+
+def _start():
+    g.metrics = _RequestStats()
+
+
+def _counted(stats, body):
+    for chunk in body:
+        stats.size += len(chunk)
+        yield chunk
+
+
+def _record(response):
+    stats = g.get('metrics')
+    if stats is None:
+        return response
+    route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    labels = (('route', route), ('method', request.method))
+    config = current_app.config
+    done = dict(
+        labels=labels, status=response.status_code, stats=stats, logger=current_app.logger,
+        request_line=f"{request.method} {request.full_path.rstrip('?')}",
+        slow_ms=config.get('METRICS_SLOW_REQUEST_MS', 0),
+        max_queries=config.get('METRICS_SLOW_REQUEST_QUERIES', 0),
+    )
+    if response.is_streamed:
+        # calculate_content_length() consommerait le générateur : on compte au passage
+        response.response = _counted(stats, response.iter_encoded())
+        response.call_on_close(lambda: _observe(**done))
+    else:
+        stats.size = response.calculate_content_length()
+        _observe(**done)
+    return response
+
+
+def _observe(labels, status, stats, logger, request_line, slow_ms, max_queries):
+    elapsed = time.perf_counter() - stats.start
+    with _lock:
+        requests_total.inc(labels + (('status', str(status)),))
+        duration.observe(labels, elapsed)
+        sql_queries.observe(labels, stats.queries)
+        sql_duration.observe(labels, stats.sql)
+        serialization.observe(labels, stats.serialization)
+        if stats.size is not None:
+            response_size.observe(labels, stats.size)
+
+    if (slow_ms and elapsed * 1000 > slow_ms) or (max_queries and stats.queries > max_queries):
+        logger.warning(
+            "Requête lente : %s → %s en %.1f ms, %d requêtes SQL (%.1f ms), sérialisation %.1f ms",
+            request_line, status, elapsed * 1000,
+            stats.queries, stats.sql * 1000, stats.serialization * 1000,
+        )
+
+
+# -- Exposition -----------------------------------------------------------------
+def render():
+    with _lock:
+        lines = [line for metric in METRICS for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view():
+    return Response(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def init_app(app):
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.json = TimedJSONProvider(app)
+    app.before_request(_start)
+    app.after_request(_record)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    with app.app_context():
+        if not event.contains(db.engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(db.engine, 'handle_error', _handle_error)
@@ -0,0 +1,42 @@
+"""
+Accès au service de prédiction (model/predict.py) depuis l'API.
+
+Le dataset et les modèles sont chargés une seule fois par processus, en tâche
+de fond dès le démarrage de l'app (`init_app`) ; une requête arrivée avant la
+fin du chargement attend simplement qu'il se termine. L'import est différé :
+l'API démarre même sans les dépendances du modèle (pandas, sklearn, TF…).
+"""
+import json
+import os
+import sys
+import threading
+
+MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'model'))
+MAPPING_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'dataset', 'code_mapping.json'))
+BACKENDS = ('lgbm', 'lstm', 'tflite')
+
+_code_names = None
+
+
+def get_predictor():
+    """Predictor partagé, avec tous les backends disponibles chargés."""
+    if MODEL_DIR not in sys.path:
+        sys.path.insert(0, MODEL_DIR)
+    import predict
+    predictor = predict.get_predictor()
+    predictor.load()
+    return predictor
+
+
+def code_name(code):
+    """Libellé d'un code d'infraction (KY_CD), sans charger les modèles."""
+    global _code_names
+    if _code_names is None:
+        with open(MAPPING_PATH, encoding='utf-8') as f:
+            _code_names = json.load(f)
+    return _code_names.get(code, code)
+
+
+def init_app(app):
+    if app.config.get('PREDICTIONS_PRELOAD'):
+        threading.Thread(target=get_predictor, name='predictions-warmup', daemon=True).start()
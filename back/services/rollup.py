@@ -0,0 +1,91 @@
+"""
+Maintenance du rollup `complaint_counts` (quartier × infraction × jour).
+
+Les plaintes sans quartier ne sont pas comptées (aucun endpoint ne les
+utilise). Les colonnes de la clé ne pouvant pas être NULL, un type inconnu
+(ofns_desc_id NULL) est stocké comme UNKNOWN_TYPE (0, aucun id de lookups)
+et une date inconnue comme UNKNOWN_DAY.
+"""
+from collections import Counter
+from datetime import date, datetime
+
+from sqlalchemy import func, insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from models.complaints import Complaint
+from models.complaint_counts import ComplaintCount
+
+UNKNOWN_TYPE = 0
+UNKNOWN_DAY = date(1900, 1, 1)
+
+KEY = ("neighborhood_id", "ofns_desc_id", "day")
+
+
+def as_day(value):
+    """Convertit une date de plainte (date, datetime ou chaîne) en date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        for parse in (lambda v: date.fromisoformat(v[:10]),
+                      lambda v: datetime.strptime(v, '%m/%d/%Y').date()):
+            try:
+                return parse(value)
+            except ValueError:
+                pass
+    return UNKNOWN_DAY
+
+
+def _upsert(rows):
+    """INSERT … ON DUPLICATE KEY / ON CONFLICT : ajoute `count` aux lignes existantes."""
+    table = ComplaintCount.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(count=table.c.count + stmt.inserted.count)
+    elif dialect in ("sqlite", "postgresql", "duckdb"):
+        # duckdb_engine dérive du dialecte PostgreSQL
+        stmt = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY), set_={"count": table.c.count + stmt.excluded.count}
+        )
+    else:
+        raise NotImplementedError(f"upsert non supporté pour {dialect}")
+    db.session.execute(stmt, rows)
+
+
+def record(complaints):
+    """
+    Incrémente le rollup pour des plaintes qui viennent d'être ajoutées
+    (objets Complaint ou dicts de valeurs de colonnes).
+    À appeler avant le commit pour rester dans la même transaction.
+    """
+    rows = (c if isinstance(c, dict) else vars(c) for c in complaints)
+    counts = Counter(
+        (r.get('neighborhood_id'), r.get('ofns_desc_id') or UNKNOWN_TYPE, as_day(r.get('cmplnt_fr_dt')))
+        for r in rows
+        if r.get('neighborhood_id') is not None
+    )
+    if counts:
+        _upsert([dict(zip(KEY, key), count=n) for key, n in counts.items()])
+
+
+def rebuild():
+    """Recalcule entièrement le rollup depuis la table complaints."""
+    day = func.coalesce(func.date(Complaint.cmplnt_fr_dt), UNKNOWN_DAY)
+    ofns = func.coalesce(Complaint.ofns_desc_id, UNKNOWN_TYPE)
+    select = (
+        db.session.query(Complaint.neighborhood_id, ofns, day, func.count(Complaint.id))
+        .filter(Complaint.neighborhood_id.isnot(None))
+        .group_by(Complaint.neighborhood_id, ofns, day)
+    )
+    db.session.query(ComplaintCount).delete()
+    db.session.execute(
+        insert(ComplaintCount.__table__).from_select([*KEY, "count"], select.statement)
+    )
+    db.session.commit()
+    return db.session.query(func.count()).select_from(ComplaintCount).scalar()
@@ -0,0 +1,207 @@
+"""
+Agrégation des plaintes en grille pour les tuiles de la carte.
+
+Chaque tuile {z}/{x}/{y} est découpée en 2^CELL_BITS x 2^CELL_BITS cellules.
+Les agrégats (centroïde + nombre de plaintes par cellule) sont calculés une
+seule fois par zoom via un GROUP BY, puis gardés en mémoire : les plaintes
+insérées par l'API y sont ajoutées (`record`) au lieu de tout recalculer.
+Au-delà de RAW_MIN_ZOOM on renvoie les points bruts.
+
+Comme le cache, les agrégats sont locaux au processus : les plaintes insérées
+par un autre worker n'y apparaissent qu'après `invalidate` ou un redémarrage.
+"""
+import math
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+
+from flask import current_app
+from sqlalchemy import func
+
+from extensions import db
+from models.complaints import Complaint
+from services import lookups
+
+CELL_BITS = 6        # 64 x 64 cellules par tuile
+RAW_MIN_ZOOM = 15    # zoom à partir duquel on renvoie les points bruts
+
+_grids = {}       # zoom → _Grid
+_computing = {}   # zoom → Future du calcul en cours
+_generation = 0   # change à chaque écriture : un calcul concurrent n'est pas gardé
+_lock = threading.Lock()
+
+
+def tile_bounds(z, x, y):
+    """Renvoie (ouest, sud, est, nord) en degrés pour une tuile XYZ."""
+    n = 1 << z
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def lonlat_to_tile(lon, lat, z):
+    n = 1 << z
+    x = int((lon + 180.0) / 360.0 * n)
+    rad = math.radians(lat)
+    y = int((1 - math.log(math.tan(rad) + 1 / math.cos(rad)) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _in_bounds(query, west, south, east, north):
+    return query.filter(
+        Complaint.longitude >= west, Complaint.longitude < east,
+        Complaint.latitude >= south, Complaint.latitude < north,
+    )
+
+
+def _cell_size(zoom, south, north):
+    lon_size = 360.0 / (1 << (zoom + CELL_BITS))
+    # cellules ~carrées à l'écran à la latitude de New York
+    return lon_size, lon_size * math.cos(math.radians((south + north) / 2))
+
+
+class _Grid:
+    """Cellules d'un zoom ({(gx, gy): [lon, lat, count]}) rangées par tuile."""
+
+    def __init__(self, zoom, bounds, rows):
+        self.zoom = zoom
+        self.bounds = bounds
+        (_, south), (_, north) = bounds
+        self.lon_size, self.lat_size = _cell_size(zoom, south, north)
+        self.cells = {}
+        self.tiles = defaultdict(list)
+        for gx, gy, count, lat, lon in rows:
+            self._new_cell((int(gx), int(gy)), float(lon), float(lat), count)
+
+    def _new_cell(self, key, lon, lat, count):
+        cell = self.cells[key] = [lon, lat, count]
+        self.tiles[lonlat_to_tile(lon, lat, self.zoom)].append(cell)
+
+    def add(self, lon, lat):
+        """Ajoute un point : même cellule (et même tuile) que le GROUP BY."""
+        (west, south), (east, north) = self.bounds
+        if not (west <= lon < east and south <= lat < north):
+            return
+        key = (math.floor(lon / self.lon_size), math.floor(lat / self.lat_size))
+        cell = self.cells.get(key)
+        if cell is None:
+            self._new_cell(key, lon, lat, 1)
+            return
+        count = cell[2] + 1
+        cell[0] += (lon - cell[0]) / count
+        cell[1] += (lat - cell[1]) / count
+        cell[2] = count
+
+    def tile(self, x, y):
+        return [tuple(cell) for cell in self.tiles.get((x, y), ())]
+
+
+def _aggregate(zoom):
+    """Agrège toute l'emprise de la carte pour un zoom."""
+    bounds = current_app.config["MAP_BOUNDS"]
+    (west, south), (east, north) = bounds
+    lon_size, lat_size = _cell_size(zoom, south, north)
+
+    gx = func.floor(Complaint.longitude / lon_size)
+    gy = func.floor(Complaint.latitude / lat_size)
+    rows = (
+        _in_bounds(
+            db.session.query(
+                gx,
+                gy,
+                func.count(Complaint.id),
+                func.avg(Complaint.latitude),
+                func.avg(Complaint.longitude),
+            ),
+            west, south, east, north,
+        )
+        .group_by(gx, gy)
+        .all()
+    )
+    return _Grid(zoom, bounds, rows)
+
+
+def get_cells(zoom, x, y):
+    with _lock:
+        grid = _grids.get(zoom)
+        if grid is None:
+            future = _computing.get(zoom)
+            owner = future is None
+            if owner:
+                future = _computing[zoom] = Future()
+                generation = _generation
+    if grid is None and not owner:
+        # une seule requête agrège ce zoom, les autres attendent son résultat
+        grid = future.result()
+    elif grid is None:
+        try:
+            grid = _aggregate(zoom)
+        except BaseException as e:
+            with _lock:
+                del _computing[zoom]
+            future.set_exception(e)
+            raise
+        with _lock:
+            del _computing[zoom]
+            # plainte insérée pendant le GROUP BY : on ne sait pas s'il l'a
+            # vue, le résultat est servi mais pas gardé
+            if _generation == generation:
+                _grids[zoom] = grid
+        future.set_result(grid)
+    with _lock:
+        return grid.tile(x, y)
+
+
+def record(complaints):
+    """Ajoute aux agrégats en mémoire des plaintes qui viennent d'être commitées (dicts de valeurs)."""
+    global _generation
+    points = [
+        (float(r['longitude']), float(r['latitude'])) for r in complaints
+        if r.get('longitude') is not None and r.get('latitude') is not None
+    ]
+    with _lock:
+        _generation += 1
+        for grid in _grids.values():
+            for lon, lat in points:
+                grid.add(lon, lat)
+
+
+def invalidate():
+    """Oublie tous les agrégats (écritures hors API) : recalcul à la prochaine tuile."""
+    global _generation
+    with _lock:
+        _generation += 1
+        _grids.clear()
+
+
+def get_points(zoom, x, y):
+    west, south, east, north = tile_bounds(zoom, x, y)
+    return _in_bounds(
+        db.session.query(Complaint.id, Complaint.latitude, Complaint.longitude, Complaint.ofns_desc_id),
+        west, south, east, north,
+    ).all()
+
+
+def _abbreviate(count):
+    if count >= 1000:
+        return f"{count / 1000:.1f}k".replace(".0k", "k")
+    return str(count)
+
+
+def tile_geojson(zoom, x, y):
+    """FeatureCollection d'une tuile : cellules agrégées, ou points bruts à fort zoom."""
+    if zoom >= RAW_MIN_ZOOM:
+        features = [{
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(p.longitude), float(p.latitude)]},
+            "properties": {"id": p.id, "type": lookups.decode(p.ofns_desc_id)},
+        } for p in get_points(zoom, x, y)]
+    else:
+        features = [{
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"point_count": count, "point_count_abbreviated": _abbreviate(count)},
+        } for lon, lat, count in get_cells(zoom, x, y)]
+    return {"type": "FeatureCollection", "features": features}
@@ -1,45 +1,138 @@
 #!/usr/bin/env python3
 # geojoin_neighborhoods.py
+# Ajoute à chaque plainte du CSV NYPD le quartier (NTAName) qui contient ses
+# coordonnées. Le CSV est lu par paquets, la jointure point-dans-polygone
+# tourne dans un pool de processus et le résultat est écrit au fil de l'eau.
+# Usage : python add_geo_zones_to_dataset.py [--workers N] [--chunk-size N] [--columns COL ...]
 
+import argparse
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-import geopandas as gpd
-from shapely.geometry import Point
+import shapely
+from shapely.geometry import shape
 
 # 1. Chemins vers tes fichiers
 CSV_PATH      = "old_dataset.csv"
 GEOJSON_PATH  = "neighborhoods.geojson"       # ton GeoJSON de quartiers
 OUTPUT_CSV    = "dataset.csv"
 
-# 2. Lecture du CSV
-df = pd.read_csv(CSV_PATH)
-
-# 3. Création d’une GeoDataFrame à partir des colonnes Lon/Lat
-gdf_points = gpd.GeoDataFrame(
-    df,
-    geometry=gpd.points_from_xy(df["Longitude"], df["Latitude"]),
-    crs="EPSG:4326"   # WGS84, même CRS que ton GeoJSON
-)
-
-# 4. Lecture du GeoJSON des quartiers
-gdf_neigh = gpd.read_file(GEOJSON_PATH).to_crs("EPSG:4326")
-
-# 5. Spatial join : pour chaque point, on récupère les attributs du polygone contenant le point
-#    on ne garde que NTAName (et éventuellement BoroName si besoin)
-joined = gpd.sjoin(
-    gdf_points,
-    gdf_neigh[["NTAName", "geometry"]],
-    how="left",
-    predicate="within"
-)
-
-# 6. joined contient désormais une colonne 'NTAName'  
-#    on remet au format DataFrame pandas classique et on enlève les colonnes spatiales
-df_final = pd.DataFrame(joined.drop(columns=["geometry", "index_right"]))
-
-# 7. Rapport sur les points hors quartier
-missing = df_final["NTAName"].isna().sum()
-print(f"Nombre de points sans quartier trouvé : {missing} sur {len(df_final)}")
-
-# 8. Sauvegarde du CSV enrichi
-df_final.to_csv(OUTPUT_CSV, index=False)
-print(f"CSV généré : {OUTPUT_CSV}")
\ No newline at end of file
+CHUNK_SIZE = 200_000
+COORD_COLUMNS = ["Latitude", "Longitude"]
+# noms du membre `crs` équivalents à EPSG:4326 (CRS84, urn:ogc:def:crs:EPSG::4326…)
+WGS84_NAMES = re.compile(r"(CRS84|EPSG:+4326)$")
+
+# 2. Index des polygones : construit une fois dans le processus parent, hérité
+#    par les workers (fork) ou reconstruit par leur initializer (spawn)
+_index = None
+
+
+def check_crs(geojson, path):
+    """Les coordonnées NYPD sont en WGS84 : un GeoJSON projeté ne trouverait aucun quartier."""
+    name = ((geojson.get("crs") or {}).get("properties") or {}).get("name")
+    if name and not WGS84_NAMES.search(name.upper()):
+        raise ValueError(f"{path} : CRS {name} non supporté, reprojeter en EPSG:4326 "
+                         f"(ogr2ogr -t_srs EPSG:4326 …)")
+
+
+def load_index(geojson_path):
+    """(STRtree des quartiers, noms NTAName) ; GeoJSON en WGS84 comme les coordonnées NYPD."""
+    global _index
+    if _index is None or _index[0] != geojson_path:
+        with open(geojson_path, encoding="utf-8") as f:
+            geojson = json.load(f)
+        check_crs(geojson, geojson_path)
+        features = [f for f in geojson["features"] if f.get("geometry")]
+        polygons = np.array([shape(f["geometry"]) for f in features], dtype=object)
+        names = np.array([f["properties"]["NTAName"] for f in features], dtype=object)
+        _index = (geojson_path, shapely.STRtree(polygons), names)
+    return _index[1], _index[2]
+
+
+def within(lons, lats):
+    """Indice du quartier contenant chaque point (-1 si aucun), prédicat `within` de sjoin."""
+    point_idx, poly_idx = _index[1].query(shapely.points(lons, lats), predicate="within")
+    out = np.full(len(lons), -1, dtype=np.int32)
+    out[point_idx] = poly_idx
+    return out
+
+
+def _coords(chunk):
+    return [pd.to_numeric(chunk[c], errors="coerce").to_numpy(dtype=float)
+            for c in ("Longitude", "Latitude")]
+
+
+def _attach(chunk, poly, names):
+    chunk["NTAName"] = np.where(poly >= 0, names[np.maximum(poly, 0)], "")
+    return chunk
+
+
+def iter_joined_chunks(csv_path, geojson_path, chunk_size=CHUNK_SIZE, workers=0,
+                       usecols=None, skiprows=0):
+    """
+    Générateur de DataFrames (colonnes texte, comme seed_db les lit) complétés
+    d'une colonne NTAName ('' hors quartier). Seules les coordonnées partent
+    vers les workers ; les paquets sont rendus dans l'ordre du fichier.
+    """
+    _, names = load_index(geojson_path)
+    if usecols is not None:
+        usecols = list(dict.fromkeys([*usecols, *COORD_COLUMNS]))
+    reader = pd.read_csv(
+        csv_path, usecols=usecols, dtype=str, keep_default_na=False, na_filter=False,
+        chunksize=chunk_size, skiprows=range(1, skiprows + 1),
+    )
+
+    if workers <= 0:
+        for chunk in reader:
+            yield _attach(chunk, within(*_coords(chunk)), names)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_index,
+                             initargs=(geojson_path,)) as pool:
+        # au plus 2 paquets d'avance par worker pour borner la mémoire
+        pending = deque()
+        for chunk in reader:
+            pending.append((chunk, pool.submit(within, *_coords(chunk))))
+            if len(pending) >= 2 * workers:
+                chunk, future = pending.popleft()
+                yield _attach(chunk, future.result(), names)
+        while pending:
+            chunk, future = pending.popleft()
+            yield _attach(chunk, future.result(), names)
+
+
+def write_joined_csv(csv_path, geojson_path, output_csv, chunk_size=CHUNK_SIZE,
+                     workers=0, usecols=None):
+    total = missing = 0
+    for i, chunk in enumerate(iter_joined_chunks(csv_path, geojson_path, chunk_size, workers, usecols)):
+        chunk.to_csv(output_csv, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        total += len(chunk)
+        missing += int((chunk["NTAName"] == "").sum())
+        print(f"    {total} lignes traitées")
+
+    # Rapport sur les points hors quartier
+    print(f"Nombre de points sans quartier trouvé : {missing} sur {total}")
+    print(f"CSV généré : {output_csv}")
+
+
+def main(csv_path=CSV_PATH, output_csv=OUTPUT_CSV):
+    parser = argparse.ArgumentParser(description="Ajoute le quartier (NTAName) de chaque plainte")
+    parser.add_argument("--csv", default=csv_path)
+    parser.add_argument("--geojson", default=GEOJSON_PATH)
+    parser.add_argument("--output", default=output_csv)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processus de jointure ; 0 = dans le processus principal")
+    parser.add_argument("--columns", nargs="+", default=None,
+                        help="colonnes du CSV à conserver (Latitude/Longitude toujours lues)")
+    args = parser.parse_args()
+    write_joined_csv(args.csv, args.geojson, args.output, args.chunk_size, args.workers, args.columns)
+
+
+if __name__ == "__main__":
+    main()
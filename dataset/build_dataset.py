@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# build_dataset.py
+# Version script du notebook clean_dataset.ipynb, incrémentale : seules les
+# plaintes postérieures au dernier jour traité (watermark) sont agrégées en
+# lignes QUARTIER × DATE (un compteur par code d'infraction + features
+# calendaires) puis ajoutées au dataset Parquet (et au CSV s'il existe).
+#
+# Usage :
+#   python build_dataset.py --csv dataset.csv      (CSV NYPD avec NTAName)
+#   python build_dataset.py --db                   (table complaints de l'API)
+#   python build_dataset.py --db --rebuild         (recalcul complet)
+#
+# Les plaintes saisies après coup pour un jour déjà traité ne sont reprises
+# que par --rebuild.
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from columnar import FEATURES, PARQUET_PATH, load_dataset, write_parquet
+
+ROOT = Path(__file__).resolve().parent
+
+MIN_YEAR = 2024          # cf. notebook : trop de disparités avant 2024
+CHUNK_SIZE = 200_000
+CSV_COLUMNS = {"CMPLNT_NUM": "CMPLNT_NUM", "CMPLNT_FR_DT": "DATE",
+               "NTAName": "QUARTIER", "KY_CD": "CODE_INFRACTION"}
+
+
+# -----------------------------------------------------------------------------
+# Watermark
+# -----------------------------------------------------------------------------
+def state_path(parquet_path: Path) -> Path:
+    """Fichier d'état propre à chaque dataset, à côté de son Parquet."""
+    return parquet_path.with_name(f"{parquet_path.stem}_state.json")
+
+
+def read_watermark(parquet_path: Path) -> date | None:
+    """Dernier jour traité : fichier d'état, sinon dernière DATE du dataset existant."""
+    state = state_path(parquet_path)
+    if state.exists():
+        with open(state, encoding="utf-8") as f:
+            return date.fromisoformat(json.load(f)["watermark"])
+    if parquet_path.exists():
+        return load_dataset(["DATE"], parquet_path=parquet_path)["DATE"].max().date()
+    return None
+
+
+def write_watermark(parquet_path: Path, day: date) -> None:
+    with open(state_path(parquet_path), "w", encoding="utf-8") as f:
+        json.dump({"watermark": day.isoformat()}, f)
+
+
+# -----------------------------------------------------------------------------
+# Sources : plaintes (CMPLNT_NUM, DATE, QUARTIER, CODE_INFRACTION) de ]since, until]
+# -----------------------------------------------------------------------------
+def _window(df: pd.DataFrame, since: date | None, until: date) -> pd.DataFrame:
+    keep = (df["DATE"].dt.year >= MIN_YEAR) & (df["DATE"] <= pd.Timestamp(until))
+    if since is not None:
+        keep &= df["DATE"] > pd.Timestamp(since)
+    return df.loc[keep]
+
+
+def complaints_from_csv(path: Path, since: date | None, until: date) -> pd.DataFrame:
+    parts = []
+    reader = pd.read_csv(path, usecols=list(CSV_COLUMNS), dtype=str,
+                         keep_default_na=False, chunksize=CHUNK_SIZE)
+    for chunk in reader:
+        chunk = chunk.rename(columns=CSV_COLUMNS)
+        chunk["DATE"] = pd.to_datetime(chunk["DATE"], format="%m/%d/%Y", errors="coerce")
+        chunk["CODE_INFRACTION"] = pd.to_numeric(chunk["CODE_INFRACTION"], errors="coerce")
+        chunk["QUARTIER"] = chunk["QUARTIER"].str.strip()
+        chunk = chunk.loc[(chunk["QUARTIER"] != "") & chunk["CODE_INFRACTION"].notna()]
+        parts.append(_window(chunk, since, until))
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=list(CSV_COLUMNS.values()))
+
+
+def complaints_from_db(since: date | None, until: date) -> pd.DataFrame:
+    from sqlalchemy import create_engine, text
+    sys.path.insert(0, str(ROOT / ".." / "back"))
+    from config import Config
+
+    query = text(
+        "SELECT c.cmplnt_num AS CMPLNT_NUM, c.cmplnt_fr_dt AS DATE, "
+        "n.name AS QUARTIER, c.ky_cd AS CODE_INFRACTION "
+        "FROM complaints c JOIN neighborhoods n ON n.id = c.neighborhood_id "
+        "WHERE c.cmplnt_fr_dt > :since AND c.cmplnt_fr_dt <= :until "
+        "AND c.ky_cd IS NOT NULL"
+    )
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+    with engine.connect() as conn:
+        df = pd.read_sql(query, conn, params={"since": since or date(MIN_YEAR - 1, 12, 31), "until": until})
+    df["DATE"] = pd.to_datetime(df["DATE"])
+    return _window(df, since, until)
+
+
+# -----------------------------------------------------------------------------
+# Agrégation (logique du notebook)
+# -----------------------------------------------------------------------------
+def add_calendar_features(df: pd.DataFrame) -> pd.DataFrame:
+    df["dow"] = df["DATE"].dt.dayofweek
+    df["month"] = df["DATE"].dt.month
+    phase = 2 * np.pi * df["DATE"].dt.dayofyear / 365
+    df["doy_sin"] = np.sin(phase)
+    df["doy_cos"] = np.cos(phase)
+    return df
+
+
+def build_rows(complaints: pd.DataFrame, codes: list[str] | None) -> pd.DataFrame:
+    """
+    Plaintes → une ligne par (QUARTIER, DATE) avec un compteur par code.
+    `codes` fixe les colonnes (celles du dataset existant) ; None = codes observés.
+    """
+    complaints = complaints.drop_duplicates()
+    counts = (
+        complaints.assign(CODE_INFRACTION=complaints["CODE_INFRACTION"].astype(int).astype(str))
+                  .groupby(["QUARTIER", "DATE", "CODE_INFRACTION"])
+                  .size()
+                  .unstack("CODE_INFRACTION", fill_value=0)
+    )
+    if codes is None:
+        codes = sorted(counts.columns, key=int)
+    else:
+        unknown = sorted(set(counts.columns) - set(codes), key=int)
+        if unknown:
+            print(f"⚠️  Codes absents du dataset ignorés : {', '.join(unknown)} (relancer avec --rebuild)")
+    rows = counts.reindex(columns=codes, fill_value=0).astype("int32").reset_index()
+    rows.columns.name = None
+    rows["NB_INFRACTION"] = rows[codes].sum(axis=1)
+    rows = add_calendar_features(rows)
+    return rows.sort_values(["DATE", "QUARTIER"], kind="stable").reset_index(drop=True)
+
+
+def existing_codes(parquet_path: Path) -> list[str] | None:
+    if not parquet_path.exists():
+        return None
+    import pyarrow.parquet as pq
+    files = sorted(parquet_path.rglob("*.parquet"))
+    if not files:
+        return None
+    names = pq.read_schema(files[0]).names
+    return [c for c in names if c not in {"QUARTIER", "DATE", "PERIOD", *FEATURES}]
+
+
+def append_csv(rows: pd.DataFrame, csv_path: Path) -> None:
+    """Garde la copie CSV alignée sur le Parquet (mêmes colonnes, même ordre)."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    rows.reindex(columns=header).to_csv(csv_path, mode="a", header=False, index=False,
+                                        date_format="%Y-%m-%d")
+
+
+# -----------------------------------------------------------------------------
+# Pipeline
+# -----------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Construction incrémentale du dataset quartier × jour")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", type=Path, help="CSV NYPD enrichi de NTAName (add_geo_zones_to_dataset.py)")
+    source.add_argument("--db", action="store_true", help="table complaints de l'API (back/config.py)")
+    parser.add_argument("--until", type=date.fromisoformat, default=date.today() - timedelta(days=1),
+                        help="dernier jour agrégé (défaut : hier, le jour en cours étant incomplet)")
+    parser.add_argument("--rebuild", action="store_true", help="ignore le watermark et réécrit tout le dataset")
+    parser.add_argument("--parquet", type=Path, default=PARQUET_PATH,
+                        help="dataset Parquet ; le CSV et le fichier d'état sont à côté, même nom")
+    args = parser.parse_args()
+    csv_path = args.parquet.with_suffix(".csv")
+
+    start = time.perf_counter()
+    since = None if args.rebuild else read_watermark(args.parquet)
+    full = since is None   # pas de dataset existant : construction complète
+    if since is not None and since >= args.until:
+        print(f"Dataset à jour (watermark {since}).")
+        return
+    print(f"[1/3] Lecture des plaintes du {since or 'début'} (exclu) au {args.until}…")
+    if args.db:
+        complaints = complaints_from_db(since, args.until)
+    else:
+        complaints = complaints_from_csv(args.csv, since, args.until)
+
+    print(f"[2/3] Agrégation de {len(complaints)} plaintes…")
+    rows = build_rows(complaints, None if full else existing_codes(args.parquet))
+
+    print("[3/3] Écriture…")
+    if rows.empty:
+        # source pas encore à jour : watermark inchangé, ces jours seront relus
+        print(f"✅ Aucune ligne ajoutée, watermark inchangé ({since or 'aucun'}) "
+              f"({time.perf_counter() - start:.1f}s)")
+        return
+    write_parquet(rows, args.parquet, append=not full)
+    if full:
+        rows.to_csv(csv_path, index=False)
+    elif csv_path.exists():
+        append_csv(rows, csv_path)
+    # dernier jour effectivement lu, pas --until : les jours que la source n'a
+    # pas encore reçus seront relus au prochain passage
+    watermark = rows["DATE"].max().date()
+    write_watermark(args.parquet, watermark)
+    print(f"✅ {len(rows)} lignes ajoutées, watermark {watermark} "
+          f"({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# columnar.py
+# Copie Parquet du dataset quartier × jour (clean_dataset.csv) : types compacts,
+# partitions par mois, lecture en mémoire mappée des seules colonnes utiles.
+# Le Parquet d'un CSV est à côté de lui, même nom en .parquet.
+# Usage : python columnar.py [csv] [dossier parquet]   (conversion d'un CSV existant)
+
+from __future__ import annotations
+
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ROOT = Path(__file__).resolve().parent
+
+CSV_PATH = ROOT / "clean_dataset.csv"
+PARQUET_PATH = ROOT / "clean_dataset.parquet"   # dossier : PERIOD=AAAA-MM/*.parquet
+
+PARTITION = "PERIOD"
+FEATURES = ["NB_INFRACTION", "dow", "month", "doy_sin", "doy_cos"]
+EXCLUDE = {"QUARTIER", "DATE", *FEATURES}
+
+
+def parquet_path_for(csv_path: Path | str) -> Path:
+    """Copie Parquet associée à un CSV (clean_dataset.csv → clean_dataset.parquet)."""
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def target_columns(csv_path: Path | str = CSV_PATH, parquet_path: Path | str | None = None) -> list[str]:
+    """Colonnes cibles (un compteur par code), lues dans le schéma sans charger les données."""
+    parquet_path = Path(parquet_path) if parquet_path is not None else parquet_path_for(csv_path)
+    if parquet_path.exists():
+        names = pq.ParquetDataset(parquet_path, partitioning="hive").schema.names
+    else:
+        names = pd.read_csv(csv_path, nrows=0).columns
+    return [c for c in names if c not in EXCLUDE and c != PARTITION]
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    QUARTIER en category, compteurs par code en int16 (int32 s'ils débordent),
+    features calendaires en int8 / float32.
+    """
+    df = df.copy()
+    df["QUARTIER"] = df["QUARTIER"].astype("category")
+    for col in df.columns:
+        if col in EXCLUDE:
+            continue
+        fits = df[col].max() <= np.iinfo(np.int16).max
+        df[col] = df[col].astype("int16" if fits else "int32")
+    casts = {"NB_INFRACTION": "int32", "dow": "int8", "month": "int8",
+             "doy_sin": "float32", "doy_cos": "float32"}
+    return df.astype({c: t for c, t in casts.items() if c in df.columns})
+
+
+def write_parquet(df: pd.DataFrame, path: Path = PARQUET_PATH, append: bool = False) -> None:
+    """
+    Écrit le dataset en Parquet partitionné par mois (PERIOD=AAAA-MM). Sans
+    `append`, le dossier existant est remplacé.
+    """
+    if not append and Path(path).exists():
+        shutil.rmtree(path)
+    df = compact_dtypes(df)
+    df[PARTITION] = df["DATE"].dt.strftime("%Y-%m")
+    pq.write_to_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        root_path=str(path),
+        partition_cols=[PARTITION],
+        existing_data_behavior="overwrite_or_ignore",
+        basename_template=f"part-{pd.Timestamp.now():%Y%m%d%H%M%S%f}-{{i}}.parquet",
+    )
+    print(f"Parquet généré : {path} ({len(df)} lignes)")
+
+
+def load_dataset(
+    columns: list[str] | None = None,
+    csv_path: Path | str = CSV_PATH,
+    parquet_path: Path | str | None = None,
+) -> pd.DataFrame:
+    """
+    Charge le dataset trié par DATE comme le CSV d'origine : depuis le Parquet
+    (mémoire mappée, `columns` seulement) s'il existe, sinon depuis `csv_path`.
+    Sans `parquet_path`, c'est la copie Parquet de `csv_path` qui est cherchée.
+    """
+    parquet_path = Path(parquet_path) if parquet_path is not None else parquet_path_for(csv_path)
+    if not parquet_path.exists():
+        return pd.read_csv(csv_path, parse_dates=["DATE"], usecols=columns)
+
+    if columns is not None and "DATE" not in columns:
+        read = [*columns, "DATE"]
+    else:
+        read = columns
+    table = pq.read_table(parquet_path, columns=read, memory_map=True, partitioning="hive")
+    df = table.to_pandas()
+    df = df.drop(columns=[PARTITION], errors="ignore")
+
+    # partitions relues mois par mois : on rétablit l'ordre chronologique
+    df = df.sort_values("DATE", kind="stable").reset_index(drop=True)
+    if "QUARTIER" in df.columns:
+        # dictionnaires unifiés entre fichiers : catégories triées comme astype("category")
+        df["QUARTIER"] = df["QUARTIER"].cat.reorder_categories(sorted(df["QUARTIER"].cat.categories))
+    if columns is not None:
+        df = df[columns]
+    return df
+
+
+if __name__ == "__main__":
+    csv_path = Path(sys.argv[1]) if len(sys.argv) > 1 else CSV_PATH
+    out_path = Path(sys.argv[2]) if len(sys.argv) > 2 else parquet_path_for(csv_path)
+    write_parquet(pd.read_csv(csv_path, parse_dates=["DATE"]), out_path)
@@ -0,0 +1,130 @@
+"""
+===============================================================================
+Artefact d'inférence LightGBM : manifeste + fichiers modèle natifs
+===============================================================================
+lgbm/artifact/
+    manifest.json     forme du modèle, colonnes, cibles, catégories, fichiers
+    <code>.txt        un booster par cible (ou long.txt pour train.py --long)
+
+Le manifeste suffit à encoder les entrées ; chaque booster n'est lu (par la
+bibliothèque LightGBM, sans dépickling sklearn) qu'à sa première utilisation.
+LightGBM n'est importé qu'à ce moment-là.
+
+Écrit par lgbm/train.py ; conversion d'un lgbm.joblib existant :
+    python artifacts.py [lgbm.joblib] [dossier artefact]
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ARTIFACT_VERSION = 1
+MANIFEST = "manifest.json"
+LONG_FILE = "long.txt"
+
+
+def encode(X: pd.DataFrame, categories: list[list]) -> np.ndarray:
+    """
+    DataFrame → matrice float64 pour Booster.predict : colonnes catégorielles
+    remplacées par leur code dans les catégories du training (NaN si inconnue).
+    """
+    X = X.copy()
+    columns = [c for c in X.columns if isinstance(X[c].dtype, pd.CategoricalDtype)]
+    for col, cats in zip(columns, categories):
+        codes = pd.Categorical(X[col].astype(str), categories=cats).codes
+        X[col] = np.where(codes >= 0, codes, np.nan)
+    return X.to_numpy(dtype=np.float64)
+
+
+def write_artifact(model, feature_cols: list[str], out_dir: Path) -> Path:
+    """
+    Exporte un MultiTargetLGBM ou LongFormatLGBM (lgbm/train.py ou
+    predict.load_lgbm) : un fichier texte LightGBM par booster, réduit à la
+    meilleure itération, et le manifeste.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    estimators = getattr(model, "estimators", None) or getattr(model, "models", None)
+    if estimators is not None:
+        kind, files = "per_target", [f"{code}.txt" for code in model.target_names]
+    else:
+        kind, estimators, files = "long", [model.model], [LONG_FILE]
+
+    for est, name in zip(estimators, files):
+        est.booster_.save_model(out_dir / name, num_iteration=getattr(est, "best_iteration_", None) or None)
+
+    manifest = {
+        "version": ARTIFACT_VERSION,
+        "kind": kind,
+        "features": list(feature_cols),
+        "targets": list(model.target_names),
+        "pandas_categorical": estimators[0].booster_.pandas_categorical or [],
+        "files": files,
+    }
+    path = out_dir / MANIFEST
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    return path
+
+
+class LGBMArtifact:
+    """
+    Modèle LGBM chargé depuis un artefact, même interface que MultiTargetLGBM.
+    `predict(X, targets)` ne lit que les boosters des cibles demandées.
+    """
+
+    def __init__(self, path: Path):
+        self.dir = Path(path)
+        with open(self.dir / MANIFEST, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"Version d'artefact non prise en charge : {manifest.get('version')!r}")
+        self.kind: str = manifest["kind"]
+        self.features: list[str] = manifest["features"]
+        self.target_names: list[str] = manifest["targets"]
+        self.categories: list[list] = manifest["pandas_categorical"]
+        self.files: list[str] = manifest["files"]
+        self._boosters: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        return (Path(path) / MANIFEST).is_file()
+
+    def booster(self, name: str):
+        """Booster du fichier `name`, lu au premier appel."""
+        booster = self._boosters.get(name)
+        if booster is None:
+            import lightgbm as lgb
+            with self._lock:
+                booster = self._boosters.get(name)
+                if booster is None:
+                    booster = self._boosters[name] = lgb.Booster(model_file=str(self.dir / name))
+        return booster
+
+    def predict(self, X: pd.DataFrame, targets: list[str] | None = None) -> pd.DataFrame:
+        targets = self.target_names if targets is None else list(targets)
+        data = encode(X[self.features], self.categories)   # sans booster chargé
+        if self.kind == "long":
+            codes = pd.Categorical(targets, categories=self.categories[-1]).codes.astype(np.float64)
+            data = np.column_stack([np.repeat(data, len(targets), axis=0), np.tile(codes, len(X))])
+            preds = self.booster(LONG_FILE).predict(data).reshape(len(X), len(targets))
+        else:
+            files = dict(zip(self.target_names, self.files))
+            preds = np.column_stack([self.booster(files[t]).predict(data) for t in targets])
+        return pd.DataFrame(preds, columns=targets, index=X.index)
+
+
+if __name__ == "__main__":
+    import sys
+    import predict
+
+    src = Path(sys.argv[1]) if len(sys.argv) > 1 else predict.LGBM_PATH
+    dst = Path(sys.argv[2]) if len(sys.argv) > 2 else predict.LGBM_ARTIFACT
+    manifest = write_artifact(predict.load_lgbm(src), ["QUARTIER", *predict.FEATURES], dst)
+    print(f"Artefact généré : {manifest}")
@@ -0,0 +1,166 @@
+"""
+===============================================================================
+Feature store quartier × jour pour la prédiction
+===============================================================================
+Un bloc contigu par quartier, trié par date : features (float32) et compteurs
+réels par code (int32). Un jour se retrouve par dichotomie, une fenêtre LSTM
+est une vue sur le bloc (aucune copie) et les nouveaux jours s'ajoutent en
+fin de bloc sans reconstruire le reste.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+class _Block:
+    """Tableaux d'un quartier avec capacité de réserve (ajouts en O(1) amorti)."""
+
+    def __init__(self, dates: np.ndarray, feats: np.ndarray, targets: np.ndarray):
+        self.n = len(dates)
+        self._dates = dates
+        self._feats = feats
+        self._targets = targets
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self._dates[:self.n]
+
+    @property
+    def feats(self) -> np.ndarray:
+        return self._feats[:self.n]
+
+    @property
+    def targets(self) -> np.ndarray:
+        return self._targets[:self.n]
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.n + extra
+        if needed <= len(self._dates):
+            return
+        capacity = max(needed, 2 * len(self._dates), 64)
+        for name in ("_dates", "_feats", "_targets"):
+            old = getattr(self, name)
+            new = np.empty((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def append(self, dates: np.ndarray, feats: np.ndarray, targets: np.ndarray) -> None:
+        """Jours postérieurs au dernier jour du bloc : écrits en fin de bloc."""
+        self._reserve(len(dates))
+        end = self.n + len(dates)
+        self._dates[self.n:end] = dates
+        self._feats[self.n:end] = feats
+        self._targets[self.n:end] = targets
+        self.n = end
+
+    def merge(self, dates: np.ndarray, feats: np.ndarray, targets: np.ndarray) -> None:
+        """Cas général (jours en retard ou corrigés) : fusion triée, le nouveau l'emporte."""
+        all_dates = np.concatenate([dates, self.dates])
+        _, first = np.unique(all_dates, return_index=True)   # trié, 1re occurrence = nouvelle valeur
+        self._dates = all_dates[first]
+        self._feats = np.concatenate([feats, self.feats])[first]
+        self._targets = np.concatenate([targets, self.targets])[first]
+        self.n = len(first)
+
+
+class FeatureStore:
+    """Features et compteurs réels indexés par (quartier, jour)."""
+
+    def __init__(self, feature_cols: list[str], target_cols: list[str]):
+        self.features = list(feature_cols)
+        self.targets = list(target_cols)
+        self._blocks: dict[str, _Block] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, feature_cols: list[str], target_cols: list[str]) -> "FeatureStore":
+        store = cls(feature_cols, target_cols)
+        store.append(df)
+        return store
+
+    # -- Écriture ---------------------------------------------------------------
+    def append(self, df: pd.DataFrame) -> None:
+        """Ajoute (ou remplace) les lignes (QUARTIER, DATE) de `df`."""
+        df = df.sort_values("DATE", kind="stable")
+        quartiers = df["QUARTIER"].astype(str).to_numpy()
+        dates = df["DATE"].to_numpy().astype("datetime64[D]")
+        feats = df[self.features].to_numpy(dtype=np.float32)
+        targets = df[self.targets].to_numpy(dtype=np.int32)
+        # regroupement par quartier en une passe (tri stable : l'ordre des dates est gardé)
+        codes, names = pd.factorize(quartiers)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.cumsum(np.bincount(codes, minlength=len(names)))
+        for quartier, stop, start in zip(names, bounds, np.r_[0, bounds[:-1]]):
+            idx = order[start:stop]
+            part = dates[idx], feats[idx], targets[idx]
+            block = self._blocks.get(quartier)
+            if block is None:
+                block = self._blocks[quartier] = _Block(*(a[:0].copy() for a in part))
+            # cas courant : jours nouveaux, postérieurs au bloc, sans doublon
+            in_order = bool(np.all(np.diff(part[0]) > np.timedelta64(0, "D")))
+            if in_order and (block.n == 0 or part[0][0] > block.dates[-1]):
+                block.append(*part)
+            else:
+                block.merge(*part)
+
+    # -- Lecture ----------------------------------------------------------------
+    @property
+    def quartiers(self) -> list[str]:
+        return sorted(self._blocks)
+
+    def __contains__(self, quartier: str) -> bool:
+        return quartier in self._blocks
+
+    def _block(self, quartier: str) -> _Block:
+        block = self._blocks.get(quartier)
+        if block is None:
+            raise ValueError(f"Quartier {quartier!r} inconnu du dataset.")
+        return block
+
+    def dates(self, quartier: str) -> np.ndarray:
+        return self._block(quartier).dates
+
+    def last_date(self) -> pd.Timestamp | None:
+        last = [b.dates[-1] for b in self._blocks.values() if b.n]
+        return pd.Timestamp(max(last)) if last else None
+
+    def locate(self, quartier: str, day) -> int | None:
+        """Position du jour dans le bloc du quartier (None s'il n'y a pas de ligne)."""
+        dates = self.dates(quartier)
+        day = np.datetime64(pd.Timestamp(day).date(), "D")
+        i = int(np.searchsorted(dates, day))
+        return i if i < len(dates) and dates[i] == day else None
+
+    def features_at(self, quartier: str, day) -> np.ndarray | None:
+        i = self.locate(quartier, day)
+        return None if i is None else self._block(quartier).feats[i]
+
+    def targets_at(self, quartier: str, day) -> np.ndarray | None:
+        i = self.locate(quartier, day)
+        return None if i is None else self._block(quartier).targets[i]
+
+    def window(self, quartier: str, day, length: int) -> np.ndarray:
+        """
+        Les `length` dernières lignes strictement antérieures à `day` (vue sur
+        le bloc, à ne pas modifier) ; moins de lignes si l'historique est court.
+        """
+        block = self._block(quartier)
+        day = np.datetime64(pd.Timestamp(day).date(), "D")
+        end = int(np.searchsorted(block.dates, day, side="left"))
+        return block.feats[max(end - length, 0):end]
+
+    def positions(self, quartier: str, days: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Version vectorisée de `locate` : (indices des jours présents, positions dans le bloc)."""
+        dates = self.dates(quartier)
+        pos = np.searchsorted(dates, days)
+        found = pos < len(dates)
+        found[found] = dates[pos[found]] == days[found]
+        return np.flatnonzero(found), pos[found]
+
+    def window_ends(self, quartier: str, days: np.ndarray) -> np.ndarray:
+        """Fin (exclue) de la fenêtre de chaque jour de `days`."""
+        return np.searchsorted(self.dates(quartier), days, side="left")
+
+    def block_features(self, quartier: str) -> np.ndarray:
+        return self._block(quartier).feats
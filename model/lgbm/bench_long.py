@@ -0,0 +1,96 @@
+# model/lgbm/bench_long.py
+# Compare le modèle par cible (MultiTargetLGBM) et le modèle unique en format
+# long (train.py --long) : durée d'entraînement, taille de l'artefact, temps de
+# chargement, débit de prédiction par lot (chemin de predict.py) et MAE par cible.
+# Usage : python bench_long.py [--rounds N] [--targets N] [--threads N]
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import train
+
+sys.path.insert(0, str(train.ROOT / ".."))
+import predict
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def throughput(model, X: pd.DataFrame, repeat: int = 3) -> float:
+    """Lignes (quartier × jour, toutes cibles) prédites par seconde."""
+    best = min(timed(model.predict, X)[1] for _ in range(repeat))
+    return len(X) / max(best, 1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark modèle par cible / modèle unique format long")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help="plafond d'itérations (défaut : n_estimators de train.py)")
+    parser.add_argument("--targets", type=int, default=None, help="n premières cibles seulement")
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    params = dict(train.LGB_PARAMS)
+    if args.rounds is not None:
+        params["n_estimators"] = args.rounds
+        params["early_stopping_rounds"] = min(params["early_stopping_rounds"], max(args.rounds // 10, 1))
+
+    X, Y, targets = train.load_and_prepare_data(train.DATA_PATH)
+    targets = targets[:args.targets] if args.targets else targets
+    X_train, X_val, y_train, y_val = train.chronological_split(X, Y)
+
+    (estimators, mae_multi, *_), t_multi = timed(
+        train.train_per_target, X_train, X_val, y_train, y_val, targets, params, 1, args.threads)
+    (booster, mae_long, *_), t_long = timed(
+        train.train_long, X_train, X_val, y_train, y_val, targets, params, args.threads)
+
+    # artefacts sous la forme chargée par predict.py
+    models = {
+        "par cible": predict.MultiTargetLGBM(estimators, targets),
+        "format long": predict.LongFormatLGBM(booster, targets),
+    }
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for (name, model), t_train in zip(models.items(), (t_multi, t_long)):
+            path = Path(tmp) / f"{name.replace(' ', '_')}.joblib"
+            joblib.dump(model, path)
+            loaded, t_load = timed(joblib.load, path)
+            rows.append({
+                "modèle": name,
+                "entraînement (s)": round(t_train, 1),
+                "artefact (Mo)": round(os.path.getsize(path) / 1e6, 2),
+                "chargement (s)": round(t_load, 3),
+                "prédiction (lignes/s)": round(throughput(loaded, X_val)),
+                "MAE moyenne": round(float(np.mean(mae_multi if name == "par cible" else mae_long)), 4),
+            })
+
+    pd.set_option("display.width", 200)
+    print("\n" + pd.DataFrame(rows).to_string(index=False))
+
+    mae = pd.DataFrame({"par cible": mae_multi, "format long": mae_long}, index=targets)
+    mae["écart"] = mae["format long"] - mae["par cible"]
+    print("\nMAE de validation par cible :")
+    print(mae.round(4).to_string())
+
+    # cohérence : chemin rapide de predict.py == LGBMRegressor.predict sur la table longue
+    X_long, _ = train.to_long(X_val, y_val, targets)
+    expected = booster.predict(X_long, num_iteration=booster.best_iteration_).reshape(len(X_val), -1)
+    gap = np.abs(models["format long"].predict(X_val).to_numpy() - expected).max()
+    print(f"\n✅ Écart max predict.py / LightGBM (format long) : {gap:.2e}")
+
+
+if __name__ == "__main__":
+    main()
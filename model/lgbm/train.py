@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import argparse
+import os
+import sys
 import numpy as np
 import pandas as pd
 import joblib
 import lightgbm as lgb
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from sklearn.metrics import mean_absolute_error
 
@@ -19,27 +23,32 @@ MODEL_DIR = ROOT
 MODEL_FILE = MODEL_DIR / "lgbm.joblib"
 MAE_FILE = MODEL_DIR / "mae_validation.csv"
 HIST_FILE = MODEL_DIR / "history_lgb.csv"
+ARTIFACT_DIR = MODEL_DIR / "artifact"   # format d'inférence lu par predict.py
 
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
+sys.path.insert(0, str(ROOT / ".." / ".." / "dataset"))
+from columnar import load_dataset, target_columns  # Parquet si présent, sinon CSV
+sys.path.insert(0, str(ROOT / ".."))
+from artifacts import write_artifact
+
 # =============================================================================
 # 2. Chargement et préparation des données
 # =============================================================================
 def load_and_prepare_data(path: Path) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
     """
-    Charge le fichier CSV, trie par QUARTIER et DATE, et prépare X (features) et Y (cibles).
-    - parse_dates=["DATE"] : convertit la colonne DATE en type datetime
+    Charge le dataset (Parquet si présent, sinon le CSV `path`), trie par QUARTIER et DATE,
+    et prépare X (features) et Y (cibles).
+    - la colonne DATE est lue en type datetime
     - trie chronologiquement pour chaque QUARTIER
     - détermine les colonnes cibles (toutes sauf QUARTIER, DATE, NB_INFRACTION, dow, month, doy_sin, doy_cos)
     - assemble X avec les features explicites et convertit QUARTIER en catégorie
     """
     print("[1/4] Chargement des données…")
-    df = pd.read_csv(path, parse_dates=["DATE"])
-
-    # Définition des colonnes cibles et des features
-    excluded = {"QUARTIER", "DATE", "NB_INFRACTION", "dow", "month", "doy_sin", "doy_cos"}
-    target_cols = [col for col in df.columns if col not in excluded]
+    # Définition des colonnes cibles et des features (seules colonnes lues)
+    target_cols = target_columns(path)
     feature_cols = ["QUARTIER", "NB_INFRACTION", "dow", "month", "doy_sin", "doy_cos"]
+    df = load_dataset([*feature_cols, *target_cols], csv_path=path)
 
     # Construction de X et Y
     X = df[feature_cols].copy()
@@ -84,6 +93,45 @@ LGB_PARAMS: dict = {
 # =============================================================================
 # 4. Entraînement par cible et collecte de l’historique
 # =============================================================================
+# Jeux train / validation des workers : hérités du parent (fork) ou transmis
+# une fois par l'initializer (spawn), pas à chaque cible
+_data: tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame] | None = None
+
+
+def set_data(X_train: pd.DataFrame, X_val: pd.DataFrame,
+             y_train: pd.DataFrame, y_val: pd.DataFrame) -> None:
+    global _data
+    _data = (X_train, X_val, y_train, y_val)
+
+
+def fit_target(target: str, params: dict) -> tuple[lgb.LGBMRegressor, float, dict[str, dict[str, list[float]]]]:
+    """Entraîne le modèle d'une cible ; renvoie (modèle, MAE de validation, historique)."""
+    X_train, X_val, y_train, y_val = _data
+
+    # Initialisation du modèle pour cette cible
+    model = lgb.LGBMRegressor(**params)
+    evals_result: dict[str, dict[str, list[float]]] = {}
+
+    # Entraînement avec évaluation sur jeux train et validation (même objet y :
+    # LightGBM ne nomme le premier jeu "training" que s'il reconnaît ses données)
+    y_target = y_train[target]
+    model.fit(
+        X_train,
+        y_target,
+        eval_set=[(X_train, y_target), (X_val, y_val[target])],
+        eval_metric=["poisson", "l1"],
+        callbacks=[
+            lgb.early_stopping(params["early_stopping_rounds"]),
+            lgb.record_evaluation(evals_result),
+        ],
+    )
+
+    # Calcul du MAE de validation pour cette cible
+    val_pred = model.predict(X_val, num_iteration=model.best_iteration_)
+    mae_val = mean_absolute_error(y_val[target], val_pred)
+    return model, mae_val, evals_result
+
+
 def train_per_target(
     X_train: pd.DataFrame,
     X_val: pd.DataFrame,
@@ -91,9 +139,12 @@ def train_per_target(
     y_val: pd.DataFrame,
     target_names: list[str],
     params: dict,
+    jobs: int = 1,
+    threads: int | None = None,
 ) -> tuple[list[lgb.LGBMRegressor], list[float], np.ndarray, np.ndarray, np.ndarray]:
     """
-    Entraîne un LGBMRegressor pour chaque cible.
+    Entraîne un LGBMRegressor pour chaque cible, dans `jobs` processus
+    (`threads` threads LightGBM chacun) si jobs > 1.
 
     Retourne :
     - la liste des modèles entraînés
@@ -104,6 +155,16 @@ def train_per_target(
     """
     print("[3/4] Entraînement par type de crime…")
     max_iters = params["n_estimators"]
+    if threads is not None:
+        params = {**params, "n_jobs": threads}
+
+    set_data(X_train, X_val, y_train, y_val)
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=set_data,
+                                 initargs=(X_train, X_val, y_train, y_val)) as pool:
+            results = list(pool.map(fit_target, target_names, [params] * len(target_names)))
+    else:
+        results = (fit_target(target, params) for target in target_names)
 
     # Pour accumuler les métriques moyennes sur toutes les cibles
     sums = np.zeros((max_iters, 4), dtype=float)   # colonnes : train_p, val_p, train_l1, val_l1
@@ -112,28 +173,9 @@ def train_per_target(
     estimators: list[lgb.LGBMRegressor] = []
     mae_list: list[float] = []
 
-    for target in target_names:
-        # Initialisation du modèle pour cette cible
-        model = lgb.LGBMRegressor(**params)
-        evals_result: dict[str, dict[str, list[float]]] = {}
-
-        # Entraînement avec évaluation sur jeux train et validation
-        model.fit(
-            X_train,
-            y_train[target],
-            eval_set=[(X_train, y_train[target]), (X_val, y_val[target])],
-            eval_metric=["poisson", "l1"],
-            callbacks=[
-                lgb.early_stopping(params["early_stopping_rounds"]),
-                lgb.record_evaluation(evals_result),
-            ],
-        )
-
+    # Agrégation dans l'ordre des cibles : mêmes résultats qu'en série
+    for model, mae_val, evals_result in results:
         estimators.append(model)
-
-        # Calcul du MAE de validation pour cette cible
-        val_pred = model.predict(X_val, num_iteration=model.best_iteration_)
-        mae_val = mean_absolute_error(y_val[target], val_pred)
         mae_list.append(mae_val)
 
         # Agrégation de l’historique d’apprentissage
@@ -147,6 +189,76 @@ def train_per_target(
     return estimators, mae_list, sums, counts, max_iters
 
 
+# =============================================================================
+# 4 bis. Variante format long : un seul booster, le code en feature
+# =============================================================================
+def to_long(X: pd.DataFrame, Y: pd.DataFrame, target_names: list[str]) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Une ligne par (jour, quartier, code) : les features de X répétées pour
+    chaque cible, la colonne CODE (catégorie, dans l'ordre des cibles) et le
+    compteur correspondant.
+    """
+    n_targets = len(target_names)
+    X_long = X.iloc[np.repeat(np.arange(len(X)), n_targets)].reset_index(drop=True)
+    X_long["CODE"] = pd.Categorical(np.tile(target_names, len(X)), categories=target_names)
+    y_long = pd.Series(Y[target_names].to_numpy().reshape(-1), name="count")
+    return X_long, y_long
+
+
+def train_long(
+    X_train: pd.DataFrame,
+    X_val: pd.DataFrame,
+    y_train: pd.DataFrame,
+    y_val: pd.DataFrame,
+    target_names: list[str],
+    params: dict,
+    threads: int | None = None,
+) -> tuple[lgb.LGBMRegressor, list[float], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Entraîne un unique booster Poisson sur la table longue. Mêmes retours que
+    `train_per_target` (MAE par cible, historique) à ceci près que le modèle
+    est unique.
+    """
+    print("[3/4] Entraînement du modèle unique (format long)…")
+    max_iters = params["n_estimators"]
+    if threads is not None:
+        params = {**params, "n_jobs": threads}
+
+    X_train_long, y_train_long = to_long(X_train, y_train, target_names)
+    X_val_long, y_val_long = to_long(X_val, y_val, target_names)
+    print(f"  → {len(X_train_long)} lignes d'entraînement, {len(X_val_long)} de validation")
+
+    model = lgb.LGBMRegressor(**params)
+    evals_result: dict[str, dict[str, list[float]]] = {}
+    model.fit(
+        X_train_long,
+        y_train_long,
+        eval_set=[(X_train_long, y_train_long), (X_val_long, y_val_long)],
+        eval_metric=["poisson", "l1"],
+        callbacks=[
+            lgb.early_stopping(params["early_stopping_rounds"]),
+            lgb.record_evaluation(evals_result),
+        ],
+    )
+
+    # MAE de validation par cible, comme le modèle par cible
+    val_pred = model.predict(X_val_long, num_iteration=model.best_iteration_)
+    val_pred = val_pred.reshape(len(X_val), len(target_names))
+    mae_list = [
+        mean_absolute_error(y_val[target], val_pred[:, i]) for i, target in enumerate(target_names)
+    ]
+
+    n_iter = len(evals_result["training"]["poisson"])
+    sums = np.zeros((max_iters, 4), dtype=float)
+    sums[:n_iter, 0] = evals_result["training"]["poisson"]
+    sums[:n_iter, 1] = evals_result["valid_1"]["poisson"]
+    sums[:n_iter, 2] = evals_result["training"]["l1"]
+    sums[:n_iter, 3] = evals_result["valid_1"]["l1"]
+    counts = np.zeros(max_iters, dtype=int)
+    counts[:n_iter] = 1
+    return model, mae_list, sums, counts, max_iters
+
+
 # =============================================================================
 # 5. Sauvegarde des artefacts : modèle, MAE, historique
 # =============================================================================
@@ -172,13 +284,50 @@ class MultiTargetLGBM:
         return pd.DataFrame(stacked, columns=self.target_names, index=X.index)
 
 
-def save_model(models: list[lgb.LGBMRegressor], targets: list[str], path: Path) -> None:
+class LongFormatLGBM:
+    """
+    Modèle unique entraîné sur la table longue (code d'infraction en feature) ;
+    même interface que MultiTargetLGBM.
+    """
+
+    def __init__(self, model: lgb.LGBMRegressor, target_names: list[str]):
+        self.model = model
+        self.target_names = target_names
+
+    def predict(self, X: pd.DataFrame) -> pd.DataFrame:
+        X_long, _ = to_long(X, pd.DataFrame(0, index=X.index, columns=self.target_names), self.target_names)
+        preds = self.model.predict(X_long, num_iteration=getattr(self.model, "best_iteration_", None))
+        stacked = preds.reshape(len(X), len(self.target_names))
+        return pd.DataFrame(stacked, columns=self.target_names, index=X.index)
+
+
+def save_model(models: list[lgb.LGBMRegressor], targets: list[str], path: Path) -> MultiTargetLGBM:
     """
     Sérialise l’objet MultiTargetLGBM dans un fichier .joblib.
     """
     multi = MultiTargetLGBM(models, targets)
     joblib.dump(multi, path)
     print(f"Modèle enregistré → {path.relative_to(ROOT)}")
+    return multi
+
+
+def save_long_model(model: lgb.LGBMRegressor, targets: list[str], path: Path) -> LongFormatLGBM:
+    """
+    Sérialise l’objet LongFormatLGBM dans un fichier .joblib.
+    """
+    long_model = LongFormatLGBM(model, targets)
+    joblib.dump(long_model, path)
+    print(f"Modèle enregistré → {path.relative_to(ROOT)}")
+    return long_model
+
+
+def save_artifact(model: MultiTargetLGBM | LongFormatLGBM, feature_cols: list[str], path: Path) -> None:
+    """
+    Exporte le modèle au format d'inférence (manifeste + un fichier LightGBM
+    natif par cible), chargé à la demande par predict.py.
+    """
+    write_artifact(model, feature_cols, path)
+    print(f"Artefact d’inférence enregistré → {path.relative_to(ROOT)}")
 
 
 def save_mae_report(mae_values: list[float], targets: list[str], path: Path) -> None:
@@ -213,6 +362,19 @@ def save_history(
 # =============================================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraînement LightGBM, un modèle par type de crime")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="cibles entraînées en parallèle (processus) ; 1 = en série")
+    parser.add_argument("--long", action="store_true",
+                        help="un seul modèle sur la table longue (code d'infraction en feature)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="threads LightGBM par processus (défaut : cœurs / jobs si --jobs > 1) ; "
+                             "les modèles ne dépendent que de ce nombre, pas de --jobs")
+    args = parser.parse_args()
+    threads = args.threads
+    if threads is None and args.jobs > 1:
+        threads = max(1, (os.cpu_count() or 1) // args.jobs)
+
     # Chargement et préparation
     X, Y, targets = load_and_prepare_data(DATA_PATH)
 
@@ -220,17 +382,30 @@ if __name__ == "__main__":
     X_train, X_val, y_train, y_val = chronological_split(X, Y)
 
     # Entraînement et collecte des métriques
-    (
-        trained_models,
-        mae_values,
-        metric_sums,
-        metric_counts,
-        max_iterations,
-    ) = train_per_target(X_train, X_val, y_train, y_val, targets, LGB_PARAMS)
+    if args.long:
+        (
+            trained_model,
+            mae_values,
+            metric_sums,
+            metric_counts,
+            max_iterations,
+        ) = train_long(X_train, X_val, y_train, y_val, targets, LGB_PARAMS, threads)
+    else:
+        (
+            trained_models,
+            mae_values,
+            metric_sums,
+            metric_counts,
+            max_iterations,
+        ) = train_per_target(X_train, X_val, y_train, y_val, targets, LGB_PARAMS, args.jobs, threads)
 
     # Sauvegarde des resultats
     print("[4/4] Sauvegarde des resultats…")
-    save_model(trained_models, targets, MODEL_FILE)
+    if args.long:
+        saved = save_long_model(trained_model, targets, MODEL_FILE)
+    else:
+        saved = save_model(trained_models, targets, MODEL_FILE)
+    save_artifact(saved, list(X.columns), ARTIFACT_DIR)
     save_mae_report(mae_values, targets, MAE_FILE)
     save_history(metric_sums, metric_counts, max_iterations, HIST_FILE)
 
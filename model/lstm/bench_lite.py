@@ -0,0 +1,91 @@
+# model/lstm/bench_lite.py
+# Compare le LSTM Keras (tf.function tracé, backend "lstm" de predict.py) et ses
+# exports TFLite (aucune quantification, float16, int8 dynamique) : latence et
+# débit par taille de lot (1, 64, tous les quartiers), écart aux prédictions
+# Keras sur les fenêtres du dernier jour du dataset.
+# Usage : python bench_lite.py [--repeat N] [--threads N]
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / ".."))
+import predict
+from lstm_lite import QUANTIZATIONS, LiteLSTM, export_tflite, find_lite_models
+
+
+def windows(predictor: predict.Predictor) -> tuple[np.ndarray, np.ndarray]:
+    """Fenêtres de tous les quartiers connus du LSTM pour le lendemain du dernier jour."""
+    day = predictor.store.last_date() + pd.Timedelta(days=1)
+    seqs, q_ids = [], []
+    for quartier in predictor.store.quartiers:
+        window = predictor.store.window(quartier, day, predict.WINDOW)
+        if len(window) == predict.WINDOW and quartier in predictor.encoder.classes_:
+            seqs.append(window)
+            q_ids.append(predictor.encoder.transform([quartier])[0])
+    return predictor.scale(np.stack(seqs)), np.asarray(q_ids, dtype=np.int32)
+
+
+def measure(model, seqs: np.ndarray, q_ids: np.ndarray, size: int, repeat: int) -> tuple[float, float]:
+    """(latence médiane d'un appel en ms, fenêtres/s) pour des lots de `size`."""
+    batch = seqs[:size], q_ids[:size]
+    np.asarray(model(*batch))   # échauffement
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        np.asarray(model(*batch))
+        times.append(time.perf_counter() - t0)
+    median = float(np.median(times))
+    return median * 1000, size / max(median, 1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LSTM Keras / TFLite")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=None, help="threads de l'interpréteur TFLite")
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    predictor = predict.Predictor()
+    predictor.load(("lstm",))
+    seqs, q_ids = windows(predictor)
+    sizes = {"1": 1, "64": min(64, len(seqs)), f"tous ({len(seqs)})": len(seqs)}
+    keras_model = predictor.models["lstm"]
+    reference = np.asarray(keras_model(seqs, q_ids))
+    keras = tf.keras.models.load_model(predict.LSTM_PATH, compile=False)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        candidates = {"keras": keras_model}
+        for quantize in QUANTIZATIONS:
+            prefix = Path(tmp) / quantize / "crime_lstm"
+            prefix.parent.mkdir()
+            export_tflite(keras, prefix, quantize)
+            candidates[f"tflite {quantize}"] = LiteLSTM(find_lite_models(prefix), args.threads)
+
+        for name, model in candidates.items():
+            row = {"modèle": name}
+            for label, size in sizes.items():
+                latency, rate = measure(model, seqs, q_ids, size, args.repeat)
+                row[f"lot {label} (ms)"] = round(latency, 2)
+                row[f"lot {label} (fenêtres/s)"] = round(rate)
+            y_hat = np.asarray(model(seqs, q_ids))
+            row["écart max"] = float(np.abs(y_hat - reference).max())
+            # part des comptes entiers (ceux servis par l'API) modifiés
+            row["comptes modifiés"] = f"{(np.rint(y_hat) != np.rint(reference)).mean():.2%}"
+            rows.append(row)
+
+    pd.set_option("display.width", 250)
+    print(pd.DataFrame(rows).set_index("modèle").T.to_string())
+
+
+if __name__ == "__main__":
+    main()
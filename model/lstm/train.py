@@ -12,7 +12,9 @@ from __future__ import annotations
 from pathlib import Path
 from datetime import datetime
 
+import argparse
 import os.path
+import sys
 import numpy as np
 import pandas as pd
 import joblib
@@ -25,7 +27,13 @@ from tensorflow.keras import layers, models, callbacks, optimizers, losses
 # -----------------------------------------------------------------------------
 DATA_PATH = "../../dataset/dataset_pred_crime_quartier_date.csv"
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "dataset"))
+from columnar import load_dataset, target_columns  # Parquet si présent, sinon CSV
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from lstm_lite import BATCH_SIZES, QUANTIZATIONS, export_tflite
+
 MODEL_FILE = "crime_lstm.keras"
+LITE_PREFIX = Path("crime_lstm")   # exports crime_lstm_b<N>.tflite lus par predict.py
 SCALER_FILE = "scaler_counts.pkl"
 ENCODER_FILE = "quartiers.pkl"
 HISTORY_FILE = "history.csv"
@@ -37,6 +45,26 @@ EPOCHS = 100
 SEED = 42
 EARLY_STOP = 20             # patience early-stopping
 
+parser = argparse.ArgumentParser(description="Entraînement du LSTM et export TFLite")
+parser.add_argument("--export-only", action="store_true",
+                    help=f"exporte {MODEL_FILE} en TFLite sans entraîner")
+parser.add_argument("--quantize", choices=QUANTIZATIONS, default="none",
+                    help="quantification de l'export TFLite (int8 : dynamique, poids seulement)")
+parser.add_argument("--export-batch", type=int, nargs="+", default=list(BATCH_SIZES),
+                    help="tailles de lot exportées (un fichier TFLite par taille)")
+ARGS = parser.parse_args()
+
+
+def export(model: tf.keras.Model) -> None:
+    print(f"Export TFLite ({ARGS.quantize}, lots {ARGS.export_batch})…")
+    for path in export_tflite(model, LITE_PREFIX, ARGS.quantize, tuple(ARGS.export_batch)):
+        print(f"  → {path} ({path.stat().st_size / 1e6:.1f} Mo)")
+
+
+if ARGS.export_only:
+    export(tf.keras.models.load_model(MODEL_FILE, compile=False))
+    sys.exit(0)
+
 np.random.seed(SEED)
 tf.keras.utils.set_random_seed(SEED)
 AUTOTUNE = tf.data.AUTOTUNE
@@ -46,18 +74,14 @@ AUTOTUNE = tf.data.AUTOTUNE
 # -----------------------------------------------------------------------------
 print("\n[1/6] Chargement et préparation des données…")
 
+TARGETS  = target_columns(DATA_PATH)
+FEATURES = ["NB_INFRACTION", "dow", "month", "doy_sin", "doy_cos"]
 df = (
-    pd.read_csv(DATA_PATH, parse_dates=["DATE"])
+    load_dataset(["QUARTIER", "DATE", *FEATURES, *TARGETS], csv_path=DATA_PATH)
       .sort_values(["QUARTIER", "DATE"])
       .reset_index(drop=True)
 )
 
-EXCLUDE = {"QUARTIER", "DATE", "NB_INFRACTION", "dow", "month",
-           "doy_sin", "doy_cos"}
-TARGETS  = [c for c in df.columns if c not in EXCLUDE]
-FEATURES = ["NB_INFRACTION", "dow", "month", "doy_sin", "doy_cos"]
-df = df[["QUARTIER", "DATE", *FEATURES, *TARGETS]]
-
 # --- Encodage Quartier ---
 if os.path.isfile(ENCODER_FILE):
     le: LabelEncoder = joblib.load(ENCODER_FILE)
@@ -96,26 +120,28 @@ print("[3/6] Construction des fenêtres temporelles…")
 N_FEATS = len(FEATURES)
 
 
-def build_sequences(source: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Retourne (X_seq, quartier_id, Y) pour un DataFrame donné."""
-    seqs, q_ids, tgts = [], [], []
-    for q_id in source["quartier_id"].unique():
-        sub = source[source["quartier_id"] == q_id].reset_index(drop=True)
-        if len(sub) <= WINDOW:
-            continue  # pas assez d'historique
-        feats = sub[FEATURES].values.astype("float32")
-        targets = sub[TARGETS].values.astype("float32")
-        for t in range(WINDOW, len(sub)):
-            seqs.append(feats[t - WINDOW : t])
-            q_ids.append(q_id)
-            tgts.append(targets[t])
-    return np.asarray(seqs), np.asarray(q_ids), np.asarray(tgts)
+def window_index(source: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Retourne (features, quartier_id, Y, fins) pour un DataFrame donné : une
+    ligne par jour (quartiers contigus, triés par date) et, pour chaque
+    échantillon, l'indice du jour prédit. La fenêtre d'un échantillon est
+    features[fin - WINDOW : fin], découpée à la volée par tf.data.
+    """
+    feats = source[FEATURES].to_numpy(dtype="float32")
+    q_ids = source["quartier_id"].to_numpy(dtype="int64")
+    targets = source[TARGETS].to_numpy(dtype="float32")
+    # rang de chaque ligne dans son quartier : au moins WINDOW jours d'historique
+    starts = np.flatnonzero(np.r_[True, q_ids[1:] != q_ids[:-1]])
+    rank = np.arange(len(q_ids)) - np.repeat(starts, np.diff(np.r_[starts, len(q_ids)]))
+    ends = np.flatnonzero(rank >= WINDOW)
+    return feats, q_ids, targets, ends
 
 
-X_tr_seq, X_tr_q, y_tr = build_sequences(train_df)
-X_te_seq, X_te_q, y_te = build_sequences(test_df)
+train_arrays = window_index(train_df)
+test_arrays = window_index(test_df)
 
-print("  → Train:", X_tr_seq.shape, "Test:", X_te_seq.shape)
+print("  → Train:", (len(train_arrays[3]), WINDOW, N_FEATS),
+      "Test:", (len(test_arrays[3]), WINDOW, N_FEATS))
 
 # -----------------------------------------------------------------------------
 # 4. Pipelines tf.data
@@ -124,17 +150,26 @@ print("[4/6] Création des jeux tf.data…")
 
 
 def make_dataset(
-    seq: np.ndarray, qid: np.ndarray, tgt: np.ndarray, shuffle: bool = True
+    feats: np.ndarray, qid: np.ndarray, tgt: np.ndarray, ends: np.ndarray,
+    shuffle: bool = True
 ) -> tf.data.Dataset:
-    ds = tf.data.Dataset.from_tensor_slices(((seq, qid), tgt))
+    """Mélange des indices d'échantillons ; fenêtres rassemblées lot par lot."""
+    feats, qid, tgt = tf.constant(feats), tf.constant(qid), tf.constant(tgt)
+    offsets = tf.range(-WINDOW, 0, dtype=tf.int64)
+
+    def gather(t: tf.Tensor):
+        seq = tf.gather(feats, t[:, tf.newaxis] + offsets)   # (lot, WINDOW, N_FEATS)
+        return (seq, tf.gather(qid, t)), tf.gather(tgt, t)
+
+    ds = tf.data.Dataset.from_tensor_slices(ends.astype("int64"))
     if shuffle:
-        ds = ds.shuffle(buffer_size=min(len(seq), 10_000),
+        ds = ds.shuffle(buffer_size=min(len(ends), 10_000),
                         seed=SEED, reshuffle_each_iteration=True)
-    return ds.batch(BATCH_SIZE).prefetch(AUTOTUNE)
+    return ds.batch(BATCH_SIZE).map(gather, num_parallel_calls=AUTOTUNE).prefetch(AUTOTUNE)
 
 
-train_ds = make_dataset(X_tr_seq, X_tr_q, y_tr, shuffle=True)
-valid_ds = make_dataset(X_te_seq, X_te_q, y_te, shuffle=False)
+train_ds = make_dataset(*train_arrays, shuffle=True)
+valid_ds = make_dataset(*test_arrays, shuffle=False)
 
 # -----------------------------------------------------------------------------
 # 5. Construction ou chargement du modèle
@@ -214,3 +249,4 @@ history = model.fit(
 )
 
 print("\nEntraînement terminé - meilleur modèle sauvegardé →", MODEL_FILE)
+export(tf.keras.models.load_model(MODEL_FILE, compile=False))   # meilleur checkpoint
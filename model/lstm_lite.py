@@ -0,0 +1,136 @@
+"""
+===============================================================================
+Export et inférence TFLite du LSTM (CPU)
+===============================================================================
+Le graphe Keras (LSTM bidirectionnel + attention) est figé (poids en
+constantes) puis converti en TFLite, éventuellement quantifié :
+    float16  poids en float16
+    int8     quantification dynamique des poids (activations en float)
+
+Les boucles LSTM converties imposent une taille de lot fixe : un fichier par
+taille, crime_lstm_b<N>.tflite. L'inférence prend le plus grand lot qui tient
+et complète le dernier paquet par des zéros.
+
+L'interpréteur vient de ai_edge_litert s'il est installé (sans TensorFlow),
+sinon de tf.lite.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+
+QUANTIZATIONS = ("none", "float16", "int8")
+BATCH_SIZES = (1, 64)
+
+
+def lite_path(prefix: Path, batch_size: int) -> Path:
+    return prefix.with_name(f"{prefix.name}_b{batch_size}.tflite")
+
+
+def find_lite_models(prefix: Path) -> dict[int, Path]:
+    """{taille de lot: fichier} des exports présents pour `prefix` (ex. lstm/crime_lstm)."""
+    pattern = re.compile(rf"{re.escape(prefix.name)}_b(\d+)\.tflite$")
+    found = {}
+    for path in prefix.parent.glob(f"{prefix.name}_b*.tflite"):
+        match = pattern.match(path.name)
+        if match:
+            found[int(match.group(1))] = path
+    return dict(sorted(found.items()))
+
+
+def export_tflite(model, prefix: Path, quantize: str = "none",
+                  batch_sizes: tuple[int, ...] = BATCH_SIZES) -> list[Path]:
+    """Convertit le modèle Keras chargé ; un fichier par taille de lot."""
+    import tensorflow as tf
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+    if quantize not in QUANTIZATIONS:
+        raise ValueError(f"quantize doit valoir {', '.join(QUANTIZATIONS)}")
+    window, n_feats = model.inputs[0].shape[1:]
+    written = []
+    for old in find_lite_models(prefix).values():
+        old.unlink()
+    for size in batch_sizes:
+        fn = tf.function(
+            lambda series_in, quartier_id: model({"series_in": series_in, "quartier_id": quartier_id},
+                                                 training=False),
+            input_signature=[
+                tf.TensorSpec((size, window, n_feats), tf.float32),
+                tf.TensorSpec((size,), tf.int32),
+            ],
+        )
+        # poids figés en constantes : l'interpréteur ne gère pas les variables lues dans la boucle LSTM
+        frozen = convert_variables_to_constants_v2(fn.get_concrete_function())
+        converter = tf.lite.TFLiteConverter.from_concrete_functions([frozen])
+        if quantize != "none":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantize == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        path = lite_path(prefix, size)
+        path.write_bytes(converter.convert())
+        written.append(path)
+    return written
+
+
+def _interpreter_class():
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class _Runner:
+    """Un interpréteur à lot fixe ; invoke n'étant pas réentrant, appels sérialisés."""
+
+    def __init__(self, interpreter_cls, path: Path, num_threads: int | None):
+        self.interpreter = interpreter_cls(model_path=str(path), num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        inputs = self.interpreter.get_input_details()
+        self.seq_index = next(d["index"] for d in inputs if "series_in" in d["name"])
+        self.qid_index = next(d["index"] for d in inputs if "quartier_id" in d["name"])
+        self.out_index = self.interpreter.get_output_details()[0]["index"]
+        self.size = int(self.interpreter.get_input_details()[0]["shape"][0])
+        self._lock = threading.Lock()
+
+    def __call__(self, seq: np.ndarray, q_id: np.ndarray) -> np.ndarray:
+        n = len(seq)
+        if n < self.size:   # dernier paquet : complété par des zéros
+            seq = np.concatenate([seq, np.zeros((self.size - n, *seq.shape[1:]), np.float32)])
+            q_id = np.concatenate([q_id, np.zeros(self.size - n, np.int32)])
+        with self._lock:
+            self.interpreter.set_tensor(self.seq_index, np.ascontiguousarray(seq, dtype=np.float32))
+            self.interpreter.set_tensor(self.qid_index, np.ascontiguousarray(q_id, dtype=np.int32))
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.out_index)[:n].copy()
+
+
+class LiteLSTM:
+    """Appelable comme le tf.function du LSTM : (séquences, ids quartier) → comptes."""
+
+    def __init__(self, paths: dict[int, Path], num_threads: int | None = None):
+        if not paths:
+            raise FileNotFoundError("Aucun export TFLite du LSTM.")
+        interpreter_cls = _interpreter_class()
+        self.runners = [_Runner(interpreter_cls, p, num_threads) for _, p in sorted(paths.items())]
+
+    def _runner(self, remaining: int) -> _Runner:
+        # plus grand lot qui tient, sinon le plus petit qui contient le reste
+        fits = [r for r in self.runners if r.size <= remaining]
+        if fits and (fits[-1].size == remaining or fits[-1] is self.runners[-1]):
+            return fits[-1]
+        return next(r for r in self.runners if r.size >= remaining)
+
+    def __call__(self, seq: np.ndarray, q_id: np.ndarray) -> np.ndarray:
+        out, start = [], 0
+        while start < len(seq):
+            runner = self._runner(len(seq) - start)
+            stop = start + min(runner.size, len(seq) - start)
+            out.append(runner(seq[start:stop], q_id[start:stop]))
+            start = stop
+        return np.concatenate(out) if out else np.empty((0, 0), np.float32)
@@ -2,155 +2,396 @@
 ===============================================================================
 Script de prédiction d'infractions par date et quartier
 ===============================================================================
+`Predictor` charge une fois le dataset et les modèles (LGBM, LSTM) puis sert
+les prédictions à chaud : utilisé par l'API (back/services/predictions.py) et
+par ce script pour le rapport d'un quartier / d'une date.
+
+LightGBM, TensorFlow et scikit-learn ne sont importés qu'au premier usage du
+backend concerné ; le LGBM est lu depuis l'artefact lgbm/artifact (cf.
+artifacts.py) s'il existe, sinon depuis lgbm.joblib.
 """
 
 from __future__ import annotations
 
 import json
 import os.path
+import sys
+import threading
 import joblib
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-import lightgbm as lgb  # pour hints de type
-from sklearn.preprocessing import LabelEncoder
-from typing import Literal
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+ROOT = Path(__file__).resolve().parent
+
+sys.path.insert(0, str(ROOT / ".." / "dataset"))
+from columnar import load_dataset, target_columns  # Parquet si présent, sinon CSV
+from feature_store import FeatureStore
+from artifacts import LGBMArtifact, encode
+from lstm_lite import LiteLSTM, find_lite_models
 
 # -----------------------------------------------------------------------------
-# 1. Valeurs en dur
+# 1. Valeurs en dur (exécution en script)
 # -----------------------------------------------------------------------------
 QUARTIER = "Chelsea-Hudson Yards"
 DATE = "2025-03-05"
-MODELE = "lgbm"  # "lgbm" ou "lstm"
+MODELE = "lgbm"  # "lgbm", "lstm" ou "tflite"
 
 # -----------------------------------------------------------------------------
 # 2. Chemins et constantes
 # -----------------------------------------------------------------------------
-DATA_PATH = "../dataset/clean_dataset.csv"
-MAPPING_PATH = "../dataset/code_mapping.json"
+DATA_PATH = ROOT / ".." / "dataset" / "clean_dataset.csv"
+MAPPING_PATH = ROOT / ".." / "dataset" / "code_mapping.json"
 
-LGBM_PATH = "lgbm/lgbm.joblib"
-LSTM_PATH = "lstm/crime_lstm.keras"
-ENCODER_PATH = "lstm/quartiers.pkl"
+LGBM_PATH = ROOT / "lgbm" / "lgbm.joblib"
+LGBM_ARTIFACT = ROOT / "lgbm" / "artifact"
+LSTM_PATH = ROOT / "lstm" / "crime_lstm.keras"
+LITE_PREFIX = ROOT / "lstm" / "crime_lstm"   # exports TFLite crime_lstm_b<N>.tflite
+ENCODER_PATH = ROOT / "lstm" / "quartiers.pkl"
+SCALER_PATH = ROOT / "lstm" / "scaler_counts.pkl"   # MinMaxScaler des FEATURES (lstm/train.py)
 WINDOW = 28  # historique 28 jours pour LSTM
 
 FEATURES = ["NB_INFRACTION", "dow", "month", "doy_sin", "doy_cos"]
 
+Backend = Literal["lgbm", "lstm", "tflite"]
+BACKENDS = ("lgbm", "lstm", "tflite")   # tflite : même LSTM, export CPU (lstm_lite.py)
+
 # -----------------------------------------------------------------------------
-# 3. Chargement commun : dataset + mapping + liste cibles
+# 3. Modèles LGBM (un estimateur par cible, ou un seul en format long)
 # -----------------------------------------------------------------------------
-print("[1/3] Chargement du dataset et des métadonnées…")
-
-df_all = pd.read_csv(DATA_PATH, parse_dates=["DATE"])
-with open(MAPPING_PATH, encoding="utf-8") as f:
-    CODE_TO_NAME: dict[str, str] = json.load(f)
+def _matrix(X: pd.DataFrame, booster) -> np.ndarray:
+    """
+    Conversion DataFrame → matrice faite une fois pour toutes les cibles
+    (catégories encodées comme au training) au lieu d'une fois par estimateur.
+    """
+    return encode(X, booster.pandas_categorical or [])
 
-EXCLUDE = {"QUARTIER", "DATE", "NB_INFRACTION", "dow", "month", "doy_sin", "doy_cos"}
-TARGETS = [c for c in df_all.columns if c not in EXCLUDE]
 
-# -----------------------------------------------------------------------------
-# 4. Prédiction LGBM multi-cible
-# -----------------------------------------------------------------------------
 class MultiTargetLGBM:
     """Wrapper sérialisé au training."""
-    def __init__(self, estimators: list[lgb.LGBMRegressor], target_names: list[str]):
+    def __init__(self, estimators: list, target_names: list[str]):
         self.estimators = estimators
         self.target_names = target_names
 
+    def __setstate__(self, state: dict) -> None:
+        # lgbm/train.py sérialise la liste sous le nom `models`
+        if "models" in state and "estimators" not in state:
+            state["estimators"] = state.pop("models")
+        self.__dict__.update(state)
+
     def predict(self, X: pd.DataFrame) -> pd.DataFrame:
+        data = _matrix(X, self.estimators[0].booster_)
         preds = [
-            est.predict(X, num_iteration=getattr(est, "best_iteration_", None))
+            est.booster_.predict(data, num_iteration=getattr(est, "best_iteration_", None))
             for est in self.estimators
         ]
         return pd.DataFrame(np.column_stack(preds), columns=self.target_names, index=X.index)
 
 
-def predict_lgbm(quartier: str, date_str: str) -> pd.DataFrame:
-    """Renvoie DataFrame <code, prediction_lgbm>."""
-    model: MultiTargetLGBM = joblib.load(LGBM_PATH)
-    row = df_all[(df_all["QUARTIER"] == quartier) & (df_all["DATE"] == date_str)]
-    if row.empty:
-        raise ValueError(f"Aucune ligne trouvée pour {quartier!r} au {date_str}.")
-    X = row[["QUARTIER", *FEATURES]].copy()
-    X["QUARTIER"] = X["QUARTIER"].astype("category")
-    y_hat = model.predict(X).iloc[0].values
-    y_int = np.clip(np.rint(y_hat), 0, None).astype(int)
-    return pd.DataFrame({"code": TARGETS, "prediction_lgbm": y_int})
+class LongFormatLGBM:
+    """Booster unique de `lgbm/train.py --long` : le code d'infraction est une feature."""
+    def __init__(self, model, target_names: list[str]):
+        self.model = model
+        self.target_names = target_names
 
-# -----------------------------------------------------------------------------
-# 5. Prédiction LSTM séquentiel
-# -----------------------------------------------------------------------------
-print("[2/3] Préparation backend LSTM…")
-
-if os.path.isfile(ENCODER_PATH):
-    le: LabelEncoder = joblib.load(ENCODER_PATH)
-    # Si l'attribut classes_ n'existe pas, on refit sur la totalité des quartiers
-    if not hasattr(le, "classes_"):
-        le.fit(df_all["QUARTIER"].unique())
-        joblib.dump(le, ENCODER_PATH)
-else:
-    le = LabelEncoder().fit(df_all["QUARTIER"].unique())
-    joblib.dump(le, ENCODER_PATH)
-    
-def _build_lstm_window(quartier: str, date_str: str) -> tuple[np.ndarray, np.ndarray]:
-    """Retourne (séquence, id_quartier) pour LSTM."""
-    sub = (
-        df_all[(df_all["QUARTIER"] == quartier) & (df_all["DATE"] < date_str)]
-        .tail(WINDOW)
-        .reset_index(drop=True)
-    )
-    if len(sub) < WINDOW:
-        raise ValueError(f"Pas assez d'historique ({len(sub)}) pour {quartier!r} au {date_str}.")
-    seq = sub[FEATURES].values[np.newaxis, ...].astype("float32")
-    if quartier not in le.classes_:
-        raise ValueError(f"Quartier '{quartier}' inconnu du modèle LSTM.")
-    q_id = le.transform([quartier]).astype("int32")
-    return seq, q_id
-
-def predict_lstm(quartier: str, date_str: str) -> pd.DataFrame:
-    """Renvoie DataFrame <code, prediction_lstm>."""
-    model = tf.keras.models.load_model(LSTM_PATH, compile=False)
-    seq, q_id = _build_lstm_window(quartier, date_str)
-    y_hat = model.predict({"series_in": seq, "quartier_id": q_id}, verbose=0)[0]
-    y_int = np.clip(np.rint(y_hat), 0, None).astype(int)
-    return pd.DataFrame({"code": TARGETS, "prediction_lstm": y_int})
+    def predict(self, X: pd.DataFrame) -> pd.DataFrame:
+        booster = self.model.booster_
+        data = _matrix(X, booster)
+        # une ligne par (ligne de X, code), codes dans l'ordre des catégories du training
+        code_cats = booster.pandas_categorical[-1]
+        codes = pd.Categorical(self.target_names, categories=code_cats).codes.astype(np.float64)
+        n_targets = len(self.target_names)
+        data = np.column_stack([np.repeat(data, n_targets, axis=0), np.tile(codes, len(X))])
+        preds = booster.predict(data, num_iteration=getattr(self.model, "best_iteration_", None))
+        return pd.DataFrame(preds.reshape(len(X), n_targets), columns=self.target_names, index=X.index)
+
+
+LGBM_CLASSES = (MultiTargetLGBM, LongFormatLGBM)
+
+
+def load_lgbm(path: Path) -> MultiTargetLGBM | LongFormatLGBM:
+    """
+    joblib.load du modèle LGBM, dans l'une ou l'autre forme. lgbm/train.py étant
+    lancé en script, les classes sont picklées comme `__main__.<Classe>` : on
+    les y expose le temps du chargement quand le processus courant (API,
+    autre script) ne les définit pas.
+    """
+    main = sys.modules["__main__"]
+    injected = [cls for cls in LGBM_CLASSES if not hasattr(main, cls.__name__)]
+    for cls in injected:
+        setattr(main, cls.__name__, cls)
+    try:
+        return joblib.load(path)
+    finally:
+        for cls in injected:
+            delattr(main, cls.__name__)
 
 # -----------------------------------------------------------------------------
-# 6. Construction et sauvegarde du rapport
+# 4. Service de prédiction
 # -----------------------------------------------------------------------------
-def build_report(quartier: str, date_str: str, backend: Literal["lgbm", "lstm"]) -> pd.DataFrame:
-    """Construit DataFrame rapport selon backend choisi."""
-    if backend == "lgbm":
-        pred_df = predict_lgbm(quartier, date_str)
-    elif backend == "lstm":
-        pred_df = predict_lstm(quartier, date_str)
-    else:
-        raise ValueError("MODELE doit être 'lgbm' ou 'lstm'.")
-
-    real_row = df_all[(df_all["QUARTIER"] == quartier) & (df_all["DATE"] == date_str)]
-    if real_row.empty:
-        raise ValueError(f"Pas de valeurs réelles pour {quartier!r} au {date_str}.")
-    real_counts = real_row[TARGETS].iloc[0].astype(int).values
-
-    report = pd.DataFrame({
-        "infraction": [CODE_TO_NAME[c] for c in TARGETS],
-        "réel": real_counts
-    })
-    report = report.merge(pred_df, left_on="infraction", right_on=pred_df["code"].map(CODE_TO_NAME))
-    report.drop(columns=["code"], inplace=True)
-
-    keep = report["réel"] > 0
-    for col in report.columns:
-        if col.startswith("prediction_"):
-            keep |= report[col] > 0
-    return report.loc[keep].reset_index(drop=True)
+class Predictor:
+    """Dataset indexé par (quartier, jour) et modèles gardés en mémoire entre les appels."""
+
+    def __init__(self, data_path: Path = DATA_PATH):
+        self.targets = target_columns(data_path)
+        df_all = load_dataset(["QUARTIER", "DATE", *FEATURES, *self.targets], csv_path=data_path)
+        with open(MAPPING_PATH, encoding="utf-8") as f:
+            self.code_to_name: dict[str, str] = json.load(f)
+        # tableaux contigus par quartier : recherche dichotomique, fenêtres sans copie
+        self.store = FeatureStore.from_frame(df_all, FEATURES, self.targets)
+        self.models: dict[str, object] = {}
+        self.encoder: LabelEncoder | None = None
+        self.scaler: MinMaxScaler | None = None
+        self._lock = threading.Lock()
+
+    # -- Chargement -------------------------------------------------------------
+    def load(self, backends: tuple[str, ...] = BACKENDS) -> list[str]:
+        """Charge les backends demandés (une seule fois) ; renvoie ceux disponibles."""
+        with self._lock:
+            for backend in backends:
+                if backend in self.models:
+                    continue
+                if backend == "lgbm" and LGBMArtifact.exists(LGBM_ARTIFACT):
+                    self.models["lgbm"] = LGBMArtifact(LGBM_ARTIFACT)
+                elif backend == "lgbm" and os.path.isfile(LGBM_PATH):
+                    self.models["lgbm"] = load_lgbm(LGBM_PATH)
+                elif backend == "lstm" and os.path.isfile(LSTM_PATH):
+                    self._load_lstm()
+                elif backend == "tflite" and find_lite_models(LITE_PREFIX):
+                    self._load_lstm_inputs()
+                    self.models["tflite"] = LiteLSTM(find_lite_models(LITE_PREFIX))
+        return self.available()
+
+    def available(self) -> list[str]:
+        return [b for b in BACKENDS if b in self.models]
+
+    def _load_lstm_inputs(self) -> None:
+        """Encodeur des quartiers et scaler des features, partagés par lstm et tflite."""
+        from sklearn.preprocessing import LabelEncoder
+
+        if self.encoder is not None:
+            return
+        if os.path.isfile(SCALER_PATH):
+            self.scaler = joblib.load(SCALER_PATH)
+        quartiers = self.store.quartiers
+        if os.path.isfile(ENCODER_PATH):
+            le: LabelEncoder = joblib.load(ENCODER_PATH)
+            # Si l'attribut classes_ n'existe pas, on refit sur la totalité des quartiers
+            if not hasattr(le, "classes_"):
+                le.fit(quartiers)
+                joblib.dump(le, ENCODER_PATH)
+        else:
+            le = LabelEncoder().fit(quartiers)
+            joblib.dump(le, ENCODER_PATH)
+        self.encoder = le
+
+    def _load_lstm(self) -> None:
+        import tensorflow as tf
+
+        self._load_lstm_inputs()
+        model = tf.keras.models.load_model(LSTM_PATH, compile=False)
+        # graphe tracé une fois : l'appel eager de Keras coûte des centaines de ms
+        self.models["lstm"] = tf.function(
+            lambda seq, q_id: model({"series_in": seq, "quartier_id": q_id}, training=False),
+            input_signature=[
+                tf.TensorSpec((None, WINDOW, len(FEATURES)), tf.float32),
+                tf.TensorSpec((None,), tf.int32),
+            ],
+        )
+        self.models["lstm"](tf.zeros((1, WINDOW, len(FEATURES))), tf.zeros((1,), tf.int32))
+
+    def _model(self, backend: str):
+        if backend not in self.models:
+            self.load((backend,))
+        if backend not in self.models:
+            raise LookupError(f"Modèle {backend!r} indisponible.")
+        return self.models[backend]
+
+    # -- Accès aux données ------------------------------------------------------
+    def append(self, df: pd.DataFrame) -> None:
+        """Ajoute de nouveaux jours (lignes au format du dataset) sans recharger le reste."""
+        with self._lock:
+            self.store.append(df)
+
+    def _features(self, quartier: str, date_str: str) -> np.ndarray:
+        feats = self.store.features_at(quartier, date_str)
+        if feats is None:
+            raise ValueError(f"Aucune ligne trouvée pour {quartier!r} au {date_str}.")
+        return feats
+
+    def _lgbm_input(self, quartiers: list[str], feats: np.ndarray) -> pd.DataFrame:
+        X = pd.DataFrame(feats, columns=FEATURES)
+        X.insert(0, "QUARTIER", pd.Categorical(quartiers, categories=self.store.quartiers))
+        return X
+
+    # -- Prédiction LGBM multi-cible --------------------------------------------
+    def predict_lgbm(self, quartier: str, date_str: str) -> pd.DataFrame:
+        """Renvoie DataFrame <code, prediction_lgbm>."""
+        model: LGBMArtifact | MultiTargetLGBM | LongFormatLGBM = self._model("lgbm")
+        X = self._lgbm_input([quartier], self._features(quartier, date_str)[np.newaxis])
+        y_hat = model.predict(X).iloc[0].values
+        y_int = np.clip(np.rint(y_hat), 0, None).astype(int)
+        return pd.DataFrame({"code": self.targets, "prediction_lgbm": y_int})
+
+    # -- Prédiction LSTM séquentiel ---------------------------------------------
+    def scale(self, seqs: np.ndarray) -> np.ndarray:
+        """Mise à l'échelle du training (MinMaxScaler.transform sur le dernier axe)."""
+        if self.scaler is None:
+            return seqs
+        return (seqs * self.scaler.scale_ + self.scaler.min_).astype(np.float32)
+
+    def _build_lstm_window(self, quartier: str, date_str: str) -> tuple[np.ndarray, np.ndarray]:
+        """Retourne (séquence non normalisée, id_quartier) pour LSTM."""
+        window = self.store.window(quartier, date_str, WINDOW)
+        if len(window) < WINDOW:
+            raise ValueError(f"Pas assez d'historique ({len(window)}) pour {quartier!r} au {date_str}.")
+        seq = window[np.newaxis, ...]   # vue float32 sur le store
+        if quartier not in self.encoder.classes_:
+            raise ValueError(f"Quartier '{quartier}' inconnu du modèle LSTM.")
+        q_id = self.encoder.transform([quartier]).astype("int32")
+        return seq, q_id
+
+    def predict_lstm(self, quartier: str, date_str: str, backend: Backend = "lstm") -> pd.DataFrame:
+        """Renvoie DataFrame <code, prediction_lstm> (prediction_tflite pour l'export TFLite)."""
+        model = self._model(backend)
+        seq, q_id = self._build_lstm_window(quartier, date_str)
+        return self._lstm_frame(model(self.scale(seq), q_id), backend)
+
+    def predict_window(self, quartier: str, window: np.ndarray, backend: Backend = "lstm") -> pd.DataFrame:
+        """
+        Comme predict_lstm, pour une fenêtre (WINDOW, FEATURES) non normalisée
+        fournie par l'appelant (ex. fenêtre en direct de l'API) : prévision du
+        jour qui suit sa dernière ligne.
+        """
+        model = self._model(backend)
+        if window.shape != (WINDOW, len(FEATURES)):
+            raise ValueError(f"Fenêtre de forme {window.shape}, attendu {(WINDOW, len(FEATURES))}.")
+        if quartier not in self.encoder.classes_:
+            raise ValueError(f"Quartier '{quartier}' inconnu du modèle LSTM.")
+        q_id = self.encoder.transform([quartier]).astype("int32")
+        return self._lstm_frame(model(self.scale(window[np.newaxis]), q_id), backend)
+
+    def _lstm_frame(self, y_hat, backend: Backend) -> pd.DataFrame:
+        y_int = np.clip(np.rint(np.asarray(y_hat)[0]), 0, None).astype(int)
+        return pd.DataFrame({"code": self.targets, f"prediction_{backend}": y_int})
+
+    def predict(self, quartier: str, date_str: str, backend: Backend) -> pd.DataFrame:
+        if backend == "lgbm":
+            return self.predict_lgbm(quartier, date_str)
+        if backend in ("lstm", "tflite"):
+            return self.predict_lstm(quartier, date_str, backend)
+        raise ValueError("MODELE doit être 'lgbm', 'lstm' ou 'tflite'.")
+
+    # -- Prédiction par lot (tous les quartiers) --------------------------------
+    def predict_batch(self, dates, backend: Backend) -> pd.DataFrame:
+        """
+        Prévisions de tous les quartiers pour `dates` : une ligne (QUARTIER, DATE)
+        par prévision possible, un compteur entier par code. Chaque estimateur
+        LGBM et le LSTM tournent une fois sur la matrice de tous les quartiers.
+        """
+        dates = pd.DatetimeIndex(pd.to_datetime(list(dates))).unique().sort_values()
+        if backend == "lgbm":
+            keys, y_hat = self._batch_lgbm(dates)
+        elif backend in ("lstm", "tflite"):
+            keys, y_hat = self._batch_lstm(dates, backend)
+        else:
+            raise ValueError("MODELE doit être 'lgbm', 'lstm' ou 'tflite'.")
+        out = pd.DataFrame(np.clip(np.rint(y_hat), 0, None).astype(int), columns=self.targets)
+        out.insert(0, "QUARTIER", [q for q, _ in keys])
+        out.insert(1, "DATE", pd.DatetimeIndex([d for _, d in keys]))
+        return out
+
+    def _batch_lgbm(self, dates: pd.DatetimeIndex):
+        model: LGBMArtifact | MultiTargetLGBM | LongFormatLGBM = self._model("lgbm")
+        days = dates.to_numpy().astype("datetime64[D]")
+        keys, feats = [], []
+        for quartier in self.store.quartiers:
+            found, pos = self.store.positions(quartier, days)
+            keys.extend((quartier, dates[i]) for i in found)
+            feats.append(self.store.block_features(quartier)[pos])
+        if not keys:
+            return keys, np.empty((0, len(self.targets)))
+        X = self._lgbm_input([q for q, _ in keys], np.concatenate(feats))
+        return keys, model.predict(X).values
+
+    def _batch_lstm(self, dates: pd.DatetimeIndex, backend: Backend = "lstm", batch_size: int = 1024):
+        model = self._model(backend)
+        keys, seqs, q_ids = [], [], []
+        known = set(self.encoder.classes_)
+        days = dates.to_numpy().astype("datetime64[D]")
+        for quartier in self.store.quartiers:
+            if quartier not in known:
+                continue
+            feats = self.store.block_features(quartier)
+            # fin (exclue) de la fenêtre = premier jour >= date, comme _build_lstm_window
+            ends = self.store.window_ends(quartier, days)
+            q_id = self.encoder.transform([quartier])[0]
+            for day, end in zip(dates, ends):
+                if end >= WINDOW:
+                    keys.append((quartier, day))
+                    seqs.append(feats[end - WINDOW:end])
+                    q_ids.append(q_id)
+        if not keys:
+            return keys, np.empty((0, len(self.targets)))
+        seqs = self.scale(np.stack(seqs))
+        q_ids = np.asarray(q_ids, dtype=np.int32)
+        y_hat = [
+            np.asarray(model(seqs[i:i + batch_size], q_ids[i:i + batch_size]))
+            for i in range(0, len(seqs), batch_size)
+        ]
+        return keys, np.concatenate(y_hat)
+
+    # -- Rapport ----------------------------------------------------------------
+    def build_report(self, quartier: str, date_str: str, backend: Backend) -> pd.DataFrame:
+        """Construit DataFrame rapport selon backend choisi."""
+        pred_df = self.predict(quartier, date_str, backend)
+
+        real_counts = self.store.targets_at(quartier, date_str)
+        if real_counts is None:
+            raise ValueError(f"Pas de valeurs réelles pour {quartier!r} au {date_str}.")
+
+        report = pd.DataFrame({
+            "code": self.targets,
+            "infraction": [self.code_to_name[c] for c in self.targets],
+            "réel": real_counts.astype(int),
+        })
+        # jointure sur le code : plusieurs codes partagent un même libellé
+        report = report.merge(pred_df, on="code")
+        report.drop(columns=["code"], inplace=True)
+
+        keep = report["réel"] > 0
+        for col in report.columns:
+            if col.startswith("prediction_"):
+                keep |= report[col] > 0
+        return report.loc[keep].reset_index(drop=True)
+
+
+_predictor: Predictor | None = None
+_predictor_lock = threading.Lock()
+
+
+def get_predictor() -> Predictor:
+    """Instance partagée par le processus, créée au premier appel."""
+    global _predictor
+    with _predictor_lock:
+        if _predictor is None:
+            _predictor = Predictor()
+        return _predictor
 
 # -----------------------------------------------------------------------------
-# 7. Exécution
+# 5. Exécution
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":
-    print(f"[3/3] Génération du rapport pour {QUARTIER!r} le {DATE} (backend={MODELE})…")
-    report_df = build_report(QUARTIER, DATE, MODELE)
+    print("[1/2] Chargement du dataset et des modèles…")
+    predictor = get_predictor()
+    predictor.load((MODELE,))
+
+    print(f"[2/2] Génération du rapport pour {QUARTIER!r} le {DATE} (backend={MODELE})…")
+    report_df = predictor.build_report(QUARTIER, DATE, MODELE)
 
     pd.set_option("display.max_rows", None)
     print(report_df.to_string(index=False))
@@ -12,6 +12,14 @@ export function fetchTopNeighborhoods(crimeType, limit = 5) {
   }).then(res => res.data);
 }
 
+// Top quartiers de plusieurs types en un seul appel → { type: [...] }
+export function fetchTopNeighborhoodsBatch(crimeTypes, limit = 5) {
+  const params = new URLSearchParams();
+  crimeTypes.forEach(type => params.append('crime_types', type));
+  params.append('limit', limit);
+  return http.get('/complaints/top_neighborhoods', { params }).then(res => res.data);
+}
+
 export function fetchCrimeTypes() {
   return http.get('/complaints/types').then(res => res.data);
 }
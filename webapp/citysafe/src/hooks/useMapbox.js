@@ -13,6 +13,17 @@ import { API_URL } from "../config";
 
 mapboxgl.accessToken = MAPBOX_TOKEN;
 
+// Tuile XYZ contenant un point (mêmes formules que back/services/tiles.py)
+function lngLatToTile(lng, lat, z) {
+  const n = 2 ** z;
+  const rad = (lat * Math.PI) / 180;
+  const x = Math.floor(((lng + 180) / 360) * n);
+  const y = Math.floor(
+    ((1 - Math.log(Math.tan(rad) + 1 / Math.cos(rad)) / Math.PI) / 2) * n
+  );
+  return [Math.min(Math.max(x, 0), n - 1), Math.min(Math.max(y, 0), n - 1)];
+}
+
 export default function useMapbox({
   containerRef,
   tooltipRef,
@@ -24,6 +35,7 @@ export default function useMapbox({
   const map = useRef(null);
   const hoveredFid = useRef(null);
   const selectedFid = useRef(null);
+  const tilesRequest = useRef(0);
 
   useEffect(() => {
     if (map.current) return;
@@ -41,32 +53,12 @@ export default function useMapbox({
       map.current.addLayer({ ...LAYERS.outline, source: SOURCE_ID });
       map.current.addLayer({ ...LAYERS.label, source: SOURCE_ID });
 
-      const resp = await fetch(`${API_URL}/complaints`);
-      const crimes = await resp.json();
-      const crimeGeojson = {
-        type: "FeatureCollection",
-        features: crimes
-          .filter((c) => c.latitude && c.longitude)
-          .map((c) => ({
-            type: "Feature",
-            geometry: {
-              type: "Point",
-              coordinates: [c.longitude, c.latitude],
-            },
-            properties: {
-              id: c.id,
-              type: c.ofns_desc,
-            },
-          })),
-      };
-
       map.current.addSource("crimes", {
         type: "geojson",
-        data: crimeGeojson,
-        cluster: true,
-        clusterMaxZoom: 14,
-        clusterRadius: 50,
+        data: { type: "FeatureCollection", features: [] },
       });
+      loadCrimeTiles();
+      map.current.on("moveend", loadCrimeTiles);
 
       map.current.addLayer({
         id: "crime-heatmap",
@@ -177,6 +169,31 @@ export default function useMapbox({
       map.current.on("click", LAYERS.fill.id, onClickFeature);
     });
 
+    async function loadCrimeTiles() {
+      const requestId = ++tilesRequest.current;
+      const z = Math.floor(map.current.getZoom());
+      const bounds = map.current.getBounds();
+      const [x0, y0] = lngLatToTile(bounds.getWest(), bounds.getNorth(), z);
+      const [x1, y1] = lngLatToTile(bounds.getEast(), bounds.getSouth(), z);
+
+      const urls = [];
+      for (let x = x0; x <= x1; x++) {
+        for (let y = y0; y <= y1; y++) {
+          urls.push(`${API_URL}/complaints/tiles/${z}/${x}/${y}`);
+        }
+      }
+      const tiles = await Promise.all(
+        urls.map((url) => fetch(url).then((resp) => resp.json()))
+      );
+      // une réponse plus récente a déjà été demandée
+      if (requestId !== tilesRequest.current) return;
+
+      map.current.getSource("crimes").setData({
+        type: "FeatureCollection",
+        features: tiles.flatMap((t) => t.features),
+      });
+    }
+
     function onMouseMove(e) {
       const f = e.features[0];
       if (!f) return;
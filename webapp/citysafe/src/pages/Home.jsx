@@ -7,7 +7,8 @@ import Top5Popup    from '../components/Top5Popup';
 import { fetchNeighborhoods } from '../api/neighborhoodsApi';
 import {
   fetchCrimeTypes,
-  fetchTopNeighborhoods
+  fetchTopNeighborhoods,
+  fetchTopNeighborhoodsBatch
 } from '../api/complaintsApi';
 import '../styles/global.scss';
 
@@ -19,6 +20,7 @@ export default function Home() {
   const [crimeTypes, setCrimeTypes]                     = useState([]);
   const [selectedCrimeType, setSelectedCrimeType]       = useState('');
   const [top5, setTop5]                                 = useState([]);
+  const [topByType, setTopByType]                       = useState({});
 
   useEffect(() => {
     fetchNeighborhoods().then(list => {
@@ -29,7 +31,12 @@ export default function Home() {
   }, []);
 
   useEffect(() => {
-    fetchCrimeTypes().then(setCrimeTypes);
+    fetchCrimeTypes().then(types => {
+      setCrimeTypes(types);
+      // Préchargement des tops de tous les types en une requête
+      const known = types.filter(Boolean);
+      if (known.length) fetchTopNeighborhoodsBatch(known).then(setTopByType);
+    });
   }, []);
 
   useEffect(() => {
@@ -37,8 +44,12 @@ export default function Home() {
       setTop5([]);
       return;
     }
+    if (topByType[selectedCrimeType]) {
+      setTop5(topByType[selectedCrimeType]);
+      return;
+    }
     fetchTopNeighborhoods(selectedCrimeType).then(setTop5);
-  }, [selectedCrimeType]);
+  }, [selectedCrimeType, topByType]);
 
   const handleNeighborhoodClick = dbId => {
     setSearchName('');